@@ -0,0 +1,114 @@
+# ──────────────────────────────────────────────────────────
+# File: Game/batch.py
+# Author: Joshua Chua Han Wei – 32781555
+# Purpose: Batched all-pairs Markov tournament kernel – every match of a
+#          round-robin propagated together as one (pairs × 4^m) array.
+# ──────────────────────────────────────────────────────────
+
+import numpy as np
+from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+from Strategies.fsm import compile_strategy
+from Markov.markovm import (
+    history_states, state_index, outcome_probabilities, propagate, propagate_successors
+)
+from Markov.product import product_chain
+from Markov.utils import payoff_vectors
+
+def batched_markov_payoffs(competitors, rounds=50, error=0.0, initial_state="CC",
+                           batch_size=4096, pairs=None):
+    """
+    Expected cumulative payoffs of every unordered pair (i < j) of `competitors`
+    in one call.  Returns an N×N array with payoff[i, j] = score of i against j
+    and NaN on the diagonal, i.e. the same numbers as one MarkovGame per pair.
+
+    All strategies are lifted to the largest memory m in the field, so each
+    competitor contributes one 4^m cooperation table per player role.  Pairs are
+    processed `batch_size` at a time: their (pairs, 4^m, 4) outcome tensors are
+    advanced together with the shift-register fold from Markov.markovm, so the
+    per-round cost is a handful of array operations for the whole batch.
+    If any competitor is stateful, all pairs run on the (history × internal
+    state) product chain so the numbers stay exact.
+
+    pairs=[(i, j), …] evaluates only those pairs; the other entries stay NaN.
+    """
+    n = len(competitors)
+    m = max([1] + [s.memory_size for s in competitors])
+
+    # One table per strategy and seat (player 1 reads the plain view,
+    # player 2 the reversed one)
+    tables_1 = [compile_strategy(s, m, state_to_last_moves) for s in competitors]
+    tables_2 = [compile_strategy(s, m, state_to_last_moves_reversed) for s in competitors]
+
+    # Stateful strategies (GrimTrigger, Prober, …) put every pair on the
+    # product chain; tables are padded to a common internal-state count K
+    k = max(t.n_internal for t in tables_1 + tables_2)
+    coop_1 = np.stack([t.padded(k).coop for t in tables_1])
+    coop_2 = np.stack([t.padded(k).coop for t in tables_2])
+    next_1 = np.stack([t.padded(k).next_internal for t in tables_1])
+    next_2 = np.stack([t.padded(k).next_internal for t in tables_2])
+    init_1 = np.array([t.initial for t in tables_1])
+    init_2 = np.array([t.initial for t in tables_2])
+
+    payoff1, payoff2 = payoff_vectors(history_states(m))
+    payoff1, payoff2 = np.repeat(payoff1, k * k), np.repeat(payoff2, k * k)
+    start = state_index((initial_state,) * m, m)
+
+    payoff = np.full((n, n), np.nan, dtype=float)
+    if pairs is None:
+        rows, cols = np.triu_indices(n, k=1)
+    else:
+        rows, cols = np.array(pairs, dtype=np.int64).reshape(-1, 2).T
+
+    for lo in range(0, len(rows), batch_size):
+        i, j = rows[lo:lo + batch_size], cols[lo:lo + batch_size]
+        if k == 1:
+            probs = outcome_probabilities(coop_1[i, 0], coop_2[j, 0], error)
+            successors = None
+        else:
+            probs, successors = product_chain(coop_1[i], next_1[i], coop_2[j], next_2[j], error)
+
+        p_t = np.zeros((len(i), len(payoff1)))
+        p_t[np.arange(len(i)), (start * k + init_1[i]) * k + init_2[j]] = 1.0
+        visits = _expected_visits(p_t, probs, successors, rounds)
+
+        payoff[i, j] = visits @ payoff1
+        payoff[j, i] = visits @ payoff2
+
+    return payoff
+
+
+def table_pair_payoffs(coop_1, coop_2, rounds=50, error=0.0, initial_state="CC",
+                       batch_size=4096):
+    """
+    Expected cumulative payoffs of matches between memoryless-state lookup
+    tables, given directly as (pairs, 4^m) cooperation probabilities of each
+    seat (e.g. GA chromosomes, 1 − bit).  Returns (score_1, score_2) arrays –
+    the numbers batched_markov_payoffs gives for the same tables.
+    """
+    coop_1, coop_2 = np.asarray(coop_1, dtype=float), np.asarray(coop_2, dtype=float)
+    m = (coop_1.shape[-1].bit_length() - 1) // 2
+    payoff1, payoff2 = payoff_vectors(history_states(m))
+    start = state_index((initial_state,) * m, m)
+
+    score_1, score_2 = np.empty(len(coop_1)), np.empty(len(coop_1))
+    for lo in range(0, len(coop_1), batch_size):
+        part = slice(lo, lo + batch_size)
+        probs = outcome_probabilities(coop_1[part], coop_2[part], error)
+        p_t = np.zeros((len(probs), len(payoff1)))
+        p_t[:, start] = 1.0
+        visits = _expected_visits(p_t, probs, None, rounds)
+        score_1[part] = visits @ payoff1
+        score_2[part] = visits @ payoff2
+    return score_1, score_2
+
+
+def _expected_visits(p_t, probs, successors, rounds):
+    """Expected number of rounds ending in each state, for a batch of chains."""
+    visits = np.zeros_like(p_t)
+    for _ in range(rounds):
+        if successors is None:
+            p_t = propagate(p_t, probs)
+        else:
+            p_t = propagate_successors(p_t, probs, successors)
+        visits += p_t
+    return visits
@@ -0,0 +1,383 @@
+# ──────────────────────────────────────────────────────────
+# File: Game/distributed.py
+# Author: Joshua Chua Han Wei – 32781555
+# Purpose: Coordinator / worker mode for round-robin tournaments over TCP –
+#          batches of matches as lookup tables, heartbeats, requeueing.
+# ──────────────────────────────────────────────────────────
+
+import atexit
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+from Strategies.fsm import FiniteStateTable
+from Game.parallel import compile_competitors, cost_chunks, match_cost, _init_worker, _play_chunk
+
+#   Protocol: every message is a 4-byte big-endian length followed by a UTF-8
+#   JSON object with a "type".  Workers drive the conversation:
+#
+#     worker → coordinator   hello · get · result{job, batch, results}
+#                            · error{job, batch, message} · heartbeat
+#     coordinator → worker   setup{job, tables, settings} · batch{job, batch, pairs}
+#                            · wait · shutdown
+#
+#   A worker that misses heartbeats for `heartbeat_timeout` seconds, or whose
+#   connection drops, is forgotten and its unfinished batches go back to the
+#   front of the queue; a late duplicate result is ignored.  Match results
+#   depend only on the (i, j) stream, so requeueing never changes them.
+#   A batch that raises is reported as an error instead, and the job fails
+#   in Coordinator.run – replaying it on another worker would fail the same way.
+#   JSON (not pickle) keeps the wire format inspectable and safe to parse;
+#   floats round-trip exactly.
+
+HEADER = struct.Struct(">I")
+
+
+def send_message(sock, message):
+    data = json.dumps(message).encode()
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_message(sock):
+    (size,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+def table_to_dict(table):
+    return dict(name=table.name, memory_size=table.memory_size, coop=table.coop.tolist(),
+                next_internal=table.next_internal.tolist(), initial=table.initial)
+
+
+def table_from_dict(d):
+    return FiniteStateTable(d["name"], d["memory_size"], np.array(d["coop"], dtype=float),
+                            np.array(d["next_internal"], dtype=np.int64), d["initial"])
+
+
+def _encode_seed(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    return seed
+
+
+def _decode_seed(seed):
+    if isinstance(seed, dict):
+        return np.random.SeedSequence(seed["entropy"], spawn_key=tuple(seed["spawn_key"]))
+    return seed
+
+
+class _Peer:
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_seen = time.monotonic()
+        self.job = 0
+
+
+class Coordinator:
+    """
+    Hands out batches of matches to any number of connected workers.  One job
+    (a tournament) runs at a time; workers stay connected between jobs and
+    receive the new tables when a job starts.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, heartbeat_timeout=10.0, orphan_timeout=60.0):
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+        self.heartbeat_timeout = heartbeat_timeout
+        self.orphan_timeout = orphan_timeout
+
+        self._cond = threading.Condition()
+        self._peers = set()
+        self._job = 0
+        self._setup = None
+        self._queue = deque()             # (batch id, pairs) still to hand out
+        self._pending = {}                # batch id → (pairs, peer working on it)
+        self._remaining = set()
+        self._results = []
+        self._error = None
+        self._closed = False
+        self.requeued = 0
+
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    @property
+    def n_workers(self):
+        with self._cond:
+            return len(self._peers)
+
+    def run(self, tables_1, tables_2, settings, chunks, timeout=None):
+        """
+        Play every batch in `chunks`; returns the combined result list.
+
+        Raises RuntimeError when a worker reports an exception in a batch, or
+        when no worker has been connected for `orphan_timeout` seconds, and
+        TimeoutError when the job is not done within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._job += 1
+            self._setup = {
+                "type": "setup", "job": self._job,
+                "tables_1": [table_to_dict(t) for t in tables_1],
+                "tables_2": [table_to_dict(t) for t in tables_2],
+                "settings": dict(settings, seed=_encode_seed(settings["seed"])),
+            }
+            self._queue = deque(enumerate(chunks))
+            self._pending = {}
+            self._remaining = set(range(len(chunks)))
+            self._results = []
+            self._error = None
+            self._cond.notify_all()
+            orphaned_since = None
+            while self._remaining:
+                now = time.monotonic()
+                if self._error is not None:
+                    self._abort()
+                    raise RuntimeError(f"Worker failed on batch {self._error['batch']}: "
+                                       f"{self._error['message']}")
+                if deadline is not None and now >= deadline:
+                    self._abort()
+                    raise TimeoutError(f"Job not finished within {timeout} s "
+                                       f"({len(self._remaining)} batches left).")
+                if self._peers:
+                    orphaned_since = None
+                elif orphaned_since is None:
+                    orphaned_since = now
+                elif now - orphaned_since >= self.orphan_timeout:
+                    self._abort()
+                    raise RuntimeError(f"No worker connected for {self.orphan_timeout} s.")
+                self._cond.wait(0.1)
+            return self._results
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+        self._server.close()
+
+    # ------------------------------------------------------------ internals
+    def _abort(self):
+        # Called with the lock held: stop handing out the failed job's batches
+        self._queue.clear()
+        self._pending.clear()
+        self._remaining = set()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(_Peer(conn),), daemon=True).start()
+
+    def _monitor(self):
+        while not self._closed:
+            time.sleep(self.heartbeat_timeout / 4)
+            now = time.monotonic()
+            with self._cond:
+                silent = [p for p in self._peers if now - p.last_seen > self.heartbeat_timeout]
+            for peer in silent:
+                # Unblocks the peer's serving thread, which then drops it
+                try:
+                    peer.conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def _serve(self, peer):
+        with self._cond:
+            self._peers.add(peer)
+        try:
+            while True:
+                message = recv_message(peer.conn)
+                reply = self._handle(peer, message)
+                if reply is not None:
+                    send_message(peer.conn, reply)
+                    if reply["type"] == "shutdown":
+                        return
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._drop(peer)
+
+    def _handle(self, peer, message):
+        with self._cond:
+            peer.last_seen = time.monotonic()
+            kind = message["type"]
+            if kind == "get":
+                if self._closed:
+                    return {"type": "shutdown"}
+                if self._setup is not None and peer.job != self._job:
+                    peer.job = self._job
+                    return self._setup
+                if self._queue:
+                    batch, pairs = self._queue.popleft()
+                    self._pending[batch] = (pairs, peer)
+                    return {"type": "batch", "job": self._job, "batch": batch, "pairs": pairs}
+                return {"type": "wait"}
+            if kind == "result":
+                if message["job"] == self._job and message["batch"] in self._remaining:
+                    self._remaining.discard(message["batch"])
+                    self._pending.pop(message["batch"], None)
+                    self._results.extend(message["results"])
+                    self._cond.notify_all()
+            elif kind == "error":
+                if message["job"] == self._job and message["batch"] in self._remaining:
+                    self._error = message
+                    self._cond.notify_all()
+            return None                   # hello / heartbeat need no reply
+
+    def _drop(self, peer):
+        with self._cond:
+            self._peers.discard(peer)
+            for batch, (pairs, owner) in list(self._pending.items()):
+                if owner is peer:
+                    del self._pending[batch]
+                    self._queue.appendleft((batch, pairs))
+                    self.requeued += 1
+        try:
+            peer.conn.close()
+        except OSError:
+            pass
+
+
+def serve_worker(host, port, heartbeat=2.0, poll=0.05):
+    """Worker loop: connect, pull batches until the coordinator says shutdown."""
+    sock = socket.create_connection((host, port))
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(message):
+        with lock:
+            send_message(sock, message)
+
+    def beat():
+        while not stop.wait(heartbeat):
+            try:
+                send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        send({"type": "hello", "pid": os.getpid()})
+        while True:
+            send({"type": "get"})
+            message = recv_message(sock)
+            kind = message["type"]
+            if kind == "shutdown":
+                break
+            if kind == "wait":
+                time.sleep(poll)
+            elif kind == "setup":
+                settings = dict(message["settings"], seed=_decode_seed(message["settings"]["seed"]))
+                _init_worker([table_from_dict(t) for t in message["tables_1"]],
+                             [table_from_dict(t) for t in message["tables_2"]], settings)
+            elif kind == "batch":
+                try:
+                    results = [[i, j, *result] for (i, j), result in _play_chunk(message["pairs"])]
+                except Exception as exc:
+                    # Report instead of dying, so the job fails instead of hanging
+                    send({"type": "error", "job": message["job"], "batch": message["batch"],
+                          "message": f"{type(exc).__name__}: {exc}"})
+                    continue
+                send({"type": "result", "job": message["job"], "batch": message["batch"],
+                      "results": results})
+    except (OSError, ConnectionError):
+        pass
+    finally:
+        stop.set()
+        sock.close()
+
+
+# Coordinators (and their local worker processes) live for the whole session,
+# so consecutive tournaments – e.g. GA generations – reuse connected workers
+_coordinators = {}
+
+
+def get_coordinator(address, local_workers=0):
+    """
+    Coordinator for `address`: "local" (127.0.0.1, free port – the single-host
+    fallback) or "host:port" to bind for remote workers.  `local_workers`
+    worker processes are started on this machine either way; "local" defaults
+    to one per CPU.
+    """
+    if address in _coordinators:
+        return _coordinators[address][0]
+    if address == "local":
+        coordinator = Coordinator("127.0.0.1", 0)
+        local_workers = local_workers or os.cpu_count() or 1
+    else:
+        host, port = address.rsplit(":", 1)
+        coordinator = Coordinator(host, int(port))
+
+    host, port = coordinator.address
+    if host in ("0.0.0.0", "::"):
+        host = "127.0.0.1"
+    processes = [multiprocessing.Process(target=serve_worker, args=(host, port), daemon=True)
+                 for _ in range(local_workers)]
+    for process in processes:
+        process.start()
+    _coordinators[address] = (coordinator, processes)
+    return coordinator
+
+
+@atexit.register
+def shutdown_coordinators():
+    for coordinator, processes in _coordinators.values():
+        coordinator.close()
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+    _coordinators.clear()
+
+
+def distributed_round_robin(competitors, address, local_workers=0, engine_type="markov",
+                            rounds=50, trials=10000, error=0.0, antithetic=False,
+                            control_variate=False, common_random_numbers=False, crn_seed=0,
+                            seed=None, pairs=None, n_batches=64, timeout=None):
+    """
+    Same contract as Game.parallel.parallel_round_robin, but matches are played
+    by whichever workers are connected to the coordinator at `address`.
+    Failures and `timeout` are raised as in Coordinator.run.
+    """
+    tables_1, tables_2 = compile_competitors(competitors)
+    settings = dict(engine_type=engine_type, rounds=rounds, trials=trials, error=error,
+                    antithetic=antithetic, control_variate=control_variate,
+                    common_random_numbers=common_random_numbers, crn_seed=crn_seed, seed=seed)
+
+    if pairs is None:
+        pairs = list(itertools.combinations(range(len(competitors)), 2))
+    if not pairs:
+        return {}
+    costs = [match_cost(tables_1[i], tables_2[j]) for i, j in pairs]
+    chunks = [[list(p) for p in chunk] for chunk in cost_chunks(pairs, costs, n_batches)]
+
+    coordinator = get_coordinator(address, local_workers)
+    results = coordinator.run(tables_1, tables_2, settings, chunks, timeout=timeout)
+    return {(i, j): (s_i, s_j, path, None if vr is None else tuple(vr))
+            for i, j, s_i, s_j, path, vr in results}
+
+
+if __name__ == "__main__":
+    # python -m Game.distributed worker HOST:PORT
+    if len(sys.argv) != 3 or sys.argv[1] != "worker":
+        sys.exit("usage: python -m Game.distributed worker HOST:PORT")
+    host, port = sys.argv[2].rsplit(":", 1)
+    serve_worker(host, int(port))
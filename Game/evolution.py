@@ -0,0 +1,115 @@
+# ──────────────────────────────────────────────────────────
+# File: Game/evolution.py
+# Author: Joshua Chua Han Wei – 32781555
+# Purpose: Replicate-vectorised evolutionary IPD – R chromosome populations
+#          evolved in lockstep as one (R × POP × 4^m) uint8 tensor.
+# ──────────────────────────────────────────────────────────
+
+import numpy as np
+from Utils.random_seed import stream
+from Game.batch import table_pair_payoffs
+
+SELECTION_RULES = ("trunc", "prop")
+
+
+def population_fitness(chromosomes, rounds=50, error=0.0):
+    """
+    (R, POP) total payoff of every individual against the rest of its own
+    population, all replicates in one batched exact Markov call.
+
+    Like ChromosomeStrategy, a chromosome reads the history the same way in
+    either seat, so seating matters: of each pair, the one earlier in the
+    population plays seat 1 – the seating of run_tournament, which the GA
+    re-runs every generation in rank order.
+    """
+    n_reps, pop_size, length = chromosomes.shape
+    seat_1, seat_2 = np.triu_indices(pop_size, k=1)
+
+    reps = np.arange(n_reps)[:, None]
+    coop = 1.0 - chromosomes                       # bit 0 → cooperate
+    score_1, score_2 = table_pair_payoffs(
+        coop[reps, seat_1].reshape(-1, length), coop[reps, seat_2].reshape(-1, length),
+        rounds=rounds, error=error,
+    )
+    fits = np.zeros((n_reps, pop_size))
+    np.add.at(fits, (reps, seat_1), score_1.reshape(n_reps, -1))
+    np.add.at(fits, (reps, seat_2), score_2.reshape(n_reps, -1))
+    return fits
+
+
+def evolve_replicates(chromosomes, nice, rule, k, rep_ids, memory=None, generations=20,
+                      rounds=50, error=0.0, mu=None, seed=None):
+    """
+    Array form of genetic.one_run for len(rep_ids) replicates at once.
+
+    chromosomes : (POP, 4^m) or (R, POP, 4^m) bits, 0 = C (the starting
+                  population, shared by every replicate when 2-D)
+    nice        : (POP,) or (R, POP) niceness of the starting individuals
+    memory      : (POP,) or (R, POP) own memory m' ≤ m of each individual
+                  (default m); its bits repeat every 4^m' and only those
+                  4^m' are mutated, so children keep their parent's memory
+    rule, k     : "trunc" (elites + middles + mutated elites) or "prop"
+                  (elites + fitness-proportional mutated offspring), k elites
+    rep_ids     : one id per replicate; replicate r draws parents and
+                  mutations from its own stream("evolution", rep_ids[r])
+    mu          : per-bit flip probability (default 1 / 4^m)
+    seed        : root of the replicate streams (default: set_seed() value)
+
+    Fitness is exact (batched Markov).  A child is nice when it cooperates
+    after all-CC, i.e. its bit 0 is 0.  Returns history / mean_fitness
+    (R × generations), fix and t_major (R,), and the final chromosomes,
+    nice and memory arrays.
+    """
+    if rule not in SELECTION_RULES:
+        raise ValueError(f"Unknown selection rule {rule!r}; expected one of {SELECTION_RULES}.")
+    chromosomes = np.asarray(chromosomes, dtype=np.uint8)
+    n_reps = len(rep_ids)
+    pop_size, length = chromosomes.shape[-2:]
+    pop = np.broadcast_to(chromosomes, (n_reps, pop_size, length)).copy()
+    nice = np.broadcast_to(np.asarray(nice, dtype=bool), (n_reps, pop_size)).copy()
+    if memory is None:
+        memory = (length.bit_length() - 1) // 2
+    memory = np.broadcast_to(np.asarray(memory, dtype=np.int64), (n_reps, pop_size)).copy()
+    mu = 1.0 / length if mu is None else mu
+    rngs = [stream("evolution", rep_id, seed=seed) for rep_id in rep_ids]
+
+    n_children = k if rule == "trunc" else pop_size - k
+    reps = np.arange(n_reps)[:, None]
+    history = np.zeros((n_reps, generations), dtype=int)
+    mean_fitness = np.zeros((n_reps, generations))
+
+    for g in range(generations):
+        fits = population_fitness(pop, rounds, error)
+        history[:, g] = nice.sum(axis=1)
+        mean_fitness[:, g] = fits.mean(axis=1)
+
+        # Stable descending rank: ties keep population order, as sorted() does
+        order = np.argsort(-fits, axis=1, kind="stable")
+        if rule == "trunc":
+            survivors = order[:, :max(k, pop_size - k)]
+            parents = order[:, :k]
+            flips = np.stack([rng.random((n_children, length)) for rng in rngs]) < mu
+        else:
+            survivors = order[:, :k]
+            draws = [rng.random(n_children + n_children * length) for rng in rngs]
+            u = np.stack([d[:n_children] for d in draws])
+            flips = np.stack([d[n_children:].reshape(n_children, length) for d in draws]) < mu
+            cum = np.cumsum(fits, axis=1)
+            parents = (cum[:, None, :] <= u[:, :, None] * cum[:, -1:, None]).sum(axis=2)
+            parents = np.minimum(parents, pop_size - 1)
+
+        # A memory-m' child flips its own 4^m' bits, repeated across the tensor
+        child_memory = memory[reps, parents]
+        own_bit = np.arange(length) % 4 ** child_memory[..., None]
+        flips = np.take_along_axis(flips, own_bit, axis=2)
+        children = pop[reps, parents] ^ flips.astype(np.uint8)
+
+        pop = np.concatenate([pop[reps, survivors], children], axis=1)
+        nice = np.concatenate([nice[reps, survivors], children[..., 0] == 0], axis=1)
+        memory = np.concatenate([memory[reps, survivors], child_memory], axis=1)
+
+    majority = history >= pop_size * 5 / 8
+    t_major = np.where(majority.any(axis=1), majority.argmax(axis=1) + 1.0, np.nan)
+    return dict(rule=rule, k=k, history=history, mean_fitness=mean_fitness,
+                fix=history[:, -1] >= pop_size * 7 / 8, t_major=t_major,
+                chromosomes=pop, nice=nice, memory=memory)
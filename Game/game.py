@@ -1,39 +1,76 @@
 # ──────────────────────────────────────────────────────────
 # File: Game/game.py
 # Author: Joshua Chua Han Wei – 32781555
-# Purpose: Core engines for the IPD – deterministic MarkovGame
+# Purpose: Core engines for the IPD – deterministic MarkovGame,
+#          infinite-horizon StationaryGame, cycle-detecting CycleGame
 #          and MonteCarloGame (with trembling-hand error support).
 # ──────────────────────────────────────────────────────────
 
-import numpy as np
+import inspect
 import random
-from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+import numpy as np
+from Utils.gamestates import states, state_to_last_moves, state_to_last_moves_reversed
 from Utils.payoff_matrix import payoff_matrix
+from Markov.utils import payoff_vectors
+from Markov.markovm import (
+    history_states, state_index, build_outcome_probabilities, scatter_transition_matrix,
+    propagate, propagate_successors
+)
+from Markov.product import build_product_chain
+from Strategies.fsm import is_stateful, compile_strategy, strategy_fingerprint
+from Markov.horizon import power_and_sum
+from Markov.stationary import long_run_distribution
+from Utils.random_seed import as_generator
+from Utils.lru_cache import LRUCache
+
+# Built chains, dense matrices and finished payoffs of MarkovGames in this
+# process, keyed by (fingerprint 1, fingerprint 2, error, memory) – repeated
+# tournaments and GA re-evaluations of unchanged pairs skip the rebuild.
+MARKOV_CACHE = LRUCache(max_bytes=256 * 2 ** 20)
 
 class MarkovGame:
-    def __init__(self, strat1, strat2, rounds=50, error=0.0, initial_state=None):
+    # "iterate"     – one vector-matrix product per round (default)
+    # "doubling"    – O(log rounds) matrix products via repeated squaring
+    # "matrix_free" – shift-register fold per round, O(4^m) time and memory;
+    #                 the dense 4^m × 4^m matrix is never built
+    #
+    # Strategies with internal flags (GrimTrigger, Prober, …) are evaluated
+    # exactly on the product chain (history, internal state of each player).
+    METHODS = ("iterate", "doubling", "matrix_free")
+
+    def __init__(self, strat1, strat2, rounds=50, error=0.0, initial_state=None, method="iterate",
+                 cache=MARKOV_CACHE):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method {method!r}; expected one of {self.METHODS}.")
         self.strat1 = strat1
         self.strat2 = strat2
         self.rounds = rounds
         self.error = error
+        self.method = method
         self.strat1Score = 0.0
         self.strat2Score = 0.0
 
         # Determine max memory size between the two strategies (minimum 1)
         self.max_memory = max(1, strat1.memory_size, strat2.memory_size)
 
-        # Dynamically select the correct matrix builder
-        if self.max_memory == 1:
-            from Markov.markov1 import build_transition_matrix
-        elif self.max_memory == 2:
-            from Markov.markov2 import build_transition_matrix
-        elif self.max_memory == 3:
-            from Markov.markov3 import build_transition_matrix
-        else:
-            raise ValueError(f"Unsupported memory size: {self.max_memory}")
-
-        # Build transition matrix and state list
-        self.transition_matrix, self.states = build_transition_matrix(strat1, strat2, error)
+        # Per-state outcome probabilities and state list (generic base-4 memory-m builder).
+        # The dense transition matrix is built lazily on first access.
+        # cache=None always rebuilds (as do strategies without a fingerprint).
+        history = history_states(self.max_memory)
+        self.cache = cache
+        self.cache_key = None
+        if cache is not None:
+            fp1, fp2 = strategy_fingerprint(strat1), strategy_fingerprint(strat2)
+            if fp1 is not None and fp2 is not None:
+                self.cache_key = (fp1, fp2, float(error), self.max_memory)
+        chain = None if self.cache_key is None else cache.get(self.cache_key)
+        if chain is None:
+            chain = self._build_chain(strat1, strat2, error)
+            if self.cache_key is not None:
+                cache.put(self.cache_key, chain)
+        (self.outcome_probs, self.successors, self.states, self.fsm_tables,
+         self.payoff1, self.payoff2) = chain
+        self._transition_matrix = None
 
         #
         # Patched initial_state handling:
@@ -64,11 +101,9 @@ class MarkovGame:
                     f"You passed {initial_state!r}."
                 )
             try:
-                idx = self.states.index(initial_state)
+                idx = history.index(initial_state)
             except ValueError:
                 raise ValueError(f"Initial state {initial_state!r} not found in 1-memory state list.")
-            self.initial_distribution = np.zeros(len(self.states))
-            self.initial_distribution[idx] = 1.0
 
         else:
             # For memory-2 (or higher), states is a list of tuples of length max_memory
@@ -78,32 +113,101 @@ class MarkovGame:
                     f"You passed {initial_state!r}."
                 )
             try:
-                idx = self.states.index(initial_state)
+                idx = history.index(initial_state)
             except ValueError:
                 raise ValueError(f"Initial state {initial_state!r} not found in {self.max_memory}-memory state list.")
-            self.initial_distribution = np.zeros(len(self.states))
-            self.initial_distribution[idx] = 1.0
 
-    def run(self):
-        p_t = self.initial_distribution.copy()
-        total1 = 0.0
-        total2 = 0.0
-
-        # Iterate over the specified number of rounds
-        for _ in range(self.rounds):
-            # Advance the distribution by one step
-            p_t = p_t @ self.transition_matrix
-
-            # Accumulate expected payoff based on the new distribution
-            for i, state in enumerate(self.states):
-                # In memory-1, state is a string like "CC"; in memory-2, state is a tuple like ("CC","DC")
-                last_round = state if isinstance(state, str) else state[-1]
-                payoff1, payoff2 = payoff_matrix[last_round]
-                total1 += p_t[i] * payoff1
-                total2 += p_t[i] * payoff2
+        if self.fsm_tables is not None:
+            # Both players start from their post-reset() internal state
+            t1, t2 = self.fsm_tables
+            idx = (idx * t1.n_internal + t1.initial) * t2.n_internal + t2.initial
+        self.initial_index = idx
+        self.initial_distribution = np.zeros(len(self.states))
+        self.initial_distribution[idx] = 1.0
 
+    def _build_chain(self, strat1, strat2, error):
+        if is_stateful(strat1) or is_stateful(strat2):
+            outcome_probs, successors, states, fsm_tables = build_product_chain(
+                strat1, strat2, error, memory=self.max_memory
+            )
+            state_history = [h for h, _, _ in states]
+        else:
+            outcome_probs, states = build_outcome_probabilities(
+                strat1, strat2, error, memory=self.max_memory
+            )
+            successors, fsm_tables = None, None
+            state_history = states
+
+        # Per-player payoff of every state's last outcome, aligned with states
+        payoff1, payoff2 = payoff_vectors(state_history)
+        chain = (outcome_probs, successors, states, fsm_tables, payoff1, payoff2)
+        for array in chain:
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False        # may be shared through the cache
+        return chain
+
+    def _cached(self, *what):
+        """Cache key of a derived result of this chain, or None when uncached."""
+        return None if self.cache_key is None else self.cache_key + what
+
+    @property
+    def transition_matrix(self):
+        if self._transition_matrix is None:
+            key = self._cached("matrix")
+            matrix = None if key is None else self.cache.get(key)
+            if matrix is None:
+                matrix = scatter_transition_matrix(self.outcome_probs, self.successors)
+                matrix.flags.writeable = False
+                if key is not None:
+                    self.cache.put(key, matrix)
+            self._transition_matrix = matrix
+        return self._transition_matrix
+
+    def step(self, p_t):
+        """Advance a distribution one round without the dense matrix."""
+        if self.successors is None:
+            return propagate(p_t, self.outcome_probs)
+        return propagate_successors(p_t, self.outcome_probs, self.successors)
+
+    def run(self):
+        key = self._cached("run", self.rounds, self.method, self.initial_index)
+        result = None if key is None else self.cache.get(key)
+        if result is None:
+            result = self._run()
+            if key is not None:
+                result[2].flags.writeable = False
+                self.cache.put(key, result)
+        total1, total2, p_t = result
         self.strat1Score = total1
         self.strat2Score = total2
+        return total1, total2, p_t.copy()
+
+    def _run(self):
+        if self.method == "matrix_free":
+            p_t = self.initial_distribution.copy()
+            visits = np.zeros_like(p_t)
+            for _ in range(self.rounds):
+                p_t = self.step(p_t)
+                visits += p_t
+        elif self.method == "doubling":
+            # visits = p_0 · (P + P^2 + … + P^rounds),  p_t = p_0 · P^rounds
+            power, total = power_and_sum(self.transition_matrix, self.rounds)
+            p_t = self.initial_distribution @ power
+            visits = self.initial_distribution @ total
+        else:
+            p_t = self.initial_distribution.copy()
+            visits = np.zeros_like(p_t)
+
+            # Iterate over the specified number of rounds
+            for _ in range(self.rounds):
+                # Advance the distribution by one step
+                p_t = p_t @ self.transition_matrix
+                # Expected number of rounds that ended in each state so far
+                visits += p_t
+
+        # Expected payoff = expected visits to each state · payoff of its last outcome
+        total1 = float(visits @ self.payoff1)
+        total2 = float(visits @ self.payoff2)
         return total1, total2, p_t
 
     def printResults(self):
@@ -111,36 +215,207 @@ class MarkovGame:
         print(f"{self.strat2.name} expected score: {self.strat2Score:.2f}")
 
 
+class StationaryGame(MarkovGame):
+    """
+    Infinite-horizon engine: instead of iterating rounds it solves for the
+    long-run distribution of the chain built by MarkovGame and returns the
+    long-run *average payoff per round* for each player.
+
+    Reducible chains are split into communicating classes (the result then
+    depends on `initial_state`); periodic chains report their Cesàro
+    (time-averaged) distribution, which is what average payoff needs.
+    """
+    def __init__(self, strat1, strat2, error=0.0, initial_state=None):
+        super().__init__(strat1, strat2, rounds=0, error=error, initial_state=initial_state)
+        self.info = None
+
+    def run(self):
+        pi, self.info = long_run_distribution(self.transition_matrix, self.initial_distribution)
+        avg1 = float(pi @ self.payoff1)
+        avg2 = float(pi @ self.payoff2)
+
+        self.strat1Score = avg1
+        self.strat2Score = avg2
+        return avg1, avg2, pi
+
+    def printResults(self):
+        print(f"{self.strat1.name} long-run payoff per round: {self.strat1Score:.4f}")
+        print(f"{self.strat2.name} long-run payoff per round: {self.strat2Score:.4f}")
+
+
+class CycleGame:
+    """
+    Noise-free match between deterministic strategies.  The joint state
+    (memory-m history, internal state of each player) takes at most
+    4^m·K1·K2 values, so the match must revisit a state and repeat from there.
+    run() plays until the first repeat, splitting the outcome sequence into a
+    pre-period (`prefix`) and a `cycle`, then computes the total for any number
+    of rounds arithmetically – 10^9 rounds cost the same as 50.
+    """
+    def __init__(self, strat1, strat2, rounds=50, initial_state='CC'):
+        self.strat1 = strat1
+        self.strat2 = strat2
+        self.rounds = rounds
+        self.initial_state = initial_state
+        self.strat1Score = 0.0
+        self.strat2Score = 0.0
+        self.prefix = []
+        self.cycle = []
+
+        # Determine max memory size (minimum 1)
+        self.max_memory = max(1, strat1.memory_size, strat2.memory_size)
+        self.table1 = compile_strategy(strat1, self.max_memory, state_to_last_moves)
+        self.table2 = compile_strategy(strat2, self.max_memory, state_to_last_moves_reversed)
+        if not (self.table1.is_deterministic and self.table2.is_deterministic):
+            raise ValueError(
+                f"CycleGame needs deterministic strategies; {strat1.name} vs {strat2.name} "
+                "has a move probability strictly between 0 and 1."
+            )
+
+    def find_cycle(self):
+        """Play until the joint state repeats; fills self.prefix and self.cycle."""
+        t1, t2 = self.table1, self.table2
+        keep = 4 ** (self.max_memory - 1)
+        h = state_index((self.initial_state,) * self.max_memory, self.max_memory)
+        k1, k2 = t1.initial, t2.initial
+
+        seen = {}
+        outcomes = []
+        while (h, k1, k2) not in seen:
+            seen[(h, k1, k2)] = len(outcomes)
+            outcome = 2 * int(t1.coop[k1, h] == 0.0) + int(t2.coop[k2, h] == 0.0)
+            k1, k2 = t1.next_internal[k1, h], t2.next_internal[k2, h]
+            outcomes.append(states[outcome])
+            h = (h % keep) * 4 + outcome
+
+        start = seen[(h, k1, k2)]
+        prefix, cycle = outcomes[:start], outcomes[start:]
+
+        # The state cycle can be longer than the outcome pattern it produces
+        # (e.g. while the history window fills); report the shortest pre-period
+        # and period of the outcome sequence itself
+        while prefix and prefix[-1] == cycle[-1]:
+            prefix.pop()
+            cycle = cycle[-1:] + cycle[:-1]
+        period = next(p for p in range(1, len(cycle) + 1)
+                      if len(cycle) % p == 0 and cycle == cycle[p:] + cycle[:p])
+
+        self.prefix, self.cycle = prefix, cycle[:period]
+        return self.prefix, self.cycle
+
+    def run(self):
+        prefix, cycle = self.find_cycle()
+        head = prefix[:self.rounds]
+        remaining = self.rounds - len(head)
+        full, partial = divmod(remaining, len(cycle))
+
+        totals = []
+        for player in (0, 1):
+            total = sum(payoff_matrix[o][player] for o in head)
+            total += full * sum(payoff_matrix[o][player] for o in cycle)
+            total += sum(payoff_matrix[o][player] for o in cycle[:partial])
+            totals.append(float(total))
+
+        self.strat1Score, self.strat2Score = totals
+        return self.strat1Score, self.strat2Score
+
+    def describe_cycle(self):
+        """e.g. "CC forever" or "DC→CD repeating", after an optional pre-period."""
+        if not self.cycle:
+            self.find_cycle()
+        body = (f"{self.cycle[0]} forever" if len(self.cycle) == 1
+                else f"{'→'.join(self.cycle)} repeating")
+        return f"{'→'.join(self.prefix)} then {body}" if self.prefix else body
+
+    def printResults(self):
+        print(f"{self.strat1.name} score: {self.strat1Score:.2f}")
+        print(f"{self.strat2.name} score: {self.strat2Score:.2f}")
+        print(f"Cycle: {self.describe_cycle()}")
+
+
+def is_deterministic_match(strat1, strat2, error, memory):
+    """
+    True when every trial of the match is identical: no trembling-hand error and
+    both strategies' move_probabilities are always 0/1 (in every internal state).
+    """
+    if error != 0:
+        return False
+    return (compile_strategy(strat1, memory, state_to_last_moves).is_deterministic
+            and compile_strategy(strat2, memory, state_to_last_moves_reversed).is_deterministic)
+
+
 class MonteCarloGame:
-    def __init__(self, strat1, strat2, rounds=50, error=0.0, initial_state='CC', trials=10000):
+    # Every draw derives from one numpy Generator (`rng`: a Generator, a seed,
+    # or None for one seeded from the global `random` state), so a match is
+    # reproducible on its own, whichever process runs it.  Deterministic
+    # seats play next_move(); sampling seats get the stream as next_move's
+    # rng=, or are sampled from move_probabilities() – which advances
+    # internal flags exactly like next_move().
+    def __init__(self, strat1, strat2, rounds=50, error=0.0, initial_state='CC', trials=10000,
+                 rng=None):
         self.strat1 = strat1
         self.strat2 = strat2
         self.rounds = rounds
         self.error = error
         self.initial_state = initial_state
         self.trials = trials
+        self.rng = as_generator(rng)
 
         # Determine max memory size (minimum 1)
         self.max_memory = max(1, strat1.memory_size, strat2.memory_size)
 
+        # Which path run() took: "deterministic" (single exact trajectory) or "sampled"
+        self.path = None
+
     def run(self):
+        # Deterministic strategies without noise: all trials would be identical,
+        # so one trajectory gives the exact score
+        if is_deterministic_match(self.strat1, self.strat2, self.error, self.max_memory):
+            self.path = "deterministic"
+            return self._play(1)
+        self.path = "sampled"
+        return self._play(self.trials)
+
+    def _mover(self, strategy, view, stream):
+        """Move function (state, view) → 'C'/'D' of one seat, drawing from `stream`."""
+        if compile_strategy(strategy, self.max_memory, view).is_deterministic:
+            return strategy.next_move
+        if "rng" in inspect.signature(strategy.next_move).parameters:
+            return lambda state, view: strategy.next_move(state, view, rng=stream)
+
+        def sample(state, view):
+            return 'C' if stream.random() < strategy.move_probabilities(state, view)["C"] else 'D'
+        return sample
+
+    def _play(self, trials):
+        # A cheap per-round source seeded once from the Generator.  Only
+        # sampling seats take move draws from it, so the sequence a stochastic
+        # strategy sees does not depend on its seat
+        stream = random.Random(int(self.rng.integers(2**63)))
+        move_1 = self._mover(self.strat1, state_to_last_moves, stream)
+        move_2 = self._mover(self.strat2, state_to_last_moves_reversed, stream)
         total_p1 = 0.0
         total_p2 = 0.0
 
-        for _ in range(self.trials):
+        for _ in range(trials):
+            # Every trial is a fresh match: clear internal flags (GrimTrigger, Prober, …)
+            self.strat1.reset()
+            self.strat2.reset()
+
             # Initialize the padded history to the initial_state, repeated max_memory times
             state = tuple([self.initial_state] * self.max_memory)
             score_p1 = 0.0
             score_p2 = 0.0
 
             for _ in range(self.rounds):
-                move1 = self.strat1.next_move(state, state_to_last_moves)
-                move2 = self.strat2.next_move(state, state_to_last_moves_reversed)
+                move1 = move_1(state, state_to_last_moves)
+                move2 = move_2(state, state_to_last_moves_reversed)
+                flip1, flip2 = stream.random(), stream.random()
 
                 # Apply error flips
-                if random.random() < self.error:
+                if flip1 < self.error:
                     move1 = 'D' if move1 == 'C' else 'C'
-                if random.random() < self.error:
+                if flip2 < self.error:
                     move2 = 'D' if move2 == 'C' else 'C'
 
                 outcome = move1 + move2
@@ -157,7 +432,7 @@ class MonteCarloGame:
             total_p1 += score_p1
             total_p2 += score_p2
 
-        avg_p1 = total_p1 / self.trials
-        avg_p2 = total_p2 / self.trials
+        avg_p1 = total_p1 / trials
+        avg_p2 = total_p2 / trials
 
         return avg_p1, avg_p2
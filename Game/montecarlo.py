@@ -0,0 +1,365 @@
+# ──────────────────────────────────────────────────────────
+# File: Game/montecarlo.py
+# Author: Joshua Chua Han Wei – 32781555
+# Purpose: Fully vectorised NumPy Monte-Carlo engine – all trials advance
+#          together as integer state arrays driven by lookup tables.
+# ──────────────────────────────────────────────────────────
+
+from statistics import NormalDist
+import numpy as np
+from Utils.running_stats import RunningStats
+from Utils.random_seed import as_generator
+from Utils.gamestates import states, state_to_last_moves, state_to_last_moves_reversed
+from Utils.payoff_matrix import payoff_matrix
+from Strategies.fsm import FiniteStateTable, compile_strategy
+from Markov.markovm import state_index, outcome_probabilities, expected_scores
+
+# One-round payoffs indexed by outcome digit CC=0, CD=1, DC=2, DD=3
+PAYOFF1 = np.array([payoff_matrix[s][0] for s in states], dtype=float)
+PAYOFF2 = np.array([payoff_matrix[s][1] for s in states], dtype=float)
+
+
+def _lookup(table, k, h):
+    """Cooperation probabilities and next internal states (None if stateless)."""
+    # Flat (internal, history) index; stateless tables skip the k term
+    if table.n_internal == 1:
+        return table.coop[0][h], None
+    flat = k * table.coop.shape[1] + h
+    return table.coop.ravel()[flat], table.next_internal.ravel()[flat]
+
+
+def memoryless(table):
+    """History-only approximation of a FiniteStateTable: frozen in its initial internal state."""
+    return FiniteStateTable(table.name, table.memory_size,
+                            table.coop[table.initial:table.initial + 1],
+                            np.zeros((1, table.coop.shape[1]), dtype=np.int64), 0)
+
+
+class VectorizedMonteCarloGame:
+    """
+    Drop-in alternative to MonteCarloGame.  Both strategies are compiled once
+    into FiniteStateTables (history window + internal flags), after which every
+    round is a handful of array operations over all trials:
+
+        state h (base-4 history index) and internal states k1, k2 per trial
+        → cooperation probabilities by table lookup
+        → intended moves (drawn only for stochastic tables) and
+          trembling-hand flips from uniform array draws
+        → payoffs summed per trial, history shifted, internal states advanced
+
+    `rng` is a numpy Generator or seed; if omitted, one is seeded from the
+    global `random` state (Utils.random_seed.as_generator), so random.seed()
+    or set_seed() makes unseeded runs reproducible.  Each simulate() call
+    derives four uniform streams from it – intended move and error flip for
+    each player – and every stream yields exactly `trials` numbers per round,
+    so two engines given equally seeded generators use common random numbers
+    draw for draw.
+
+    Variance reduction (run() only):
+      antithetic=True       – trials come in pairs driven by u and 1 − u
+      control_variate=True  – each trial is also replayed, on the same
+                              uniforms, by the memoryless approximation of
+                              both strategies (internal flags frozen at reset);
+                              its exact Markov expectation is the control mean.
+    After run(), `se` holds the standard errors and `variance_reduction` the
+    ratio plain-sampling variance / achieved variance for each player.
+
+    Importance sampling (importance_error=q): error flips are drawn at the
+    inflated rate q instead of `error`, and every trial's score is multiplied
+    by its likelihood ratio  Π (ε/q)^flipped · ((1−ε)/(1−q))^kept  over both
+    players' moves, so simulate(), run() and run_adaptive() stay unbiased for
+    the ε game while seeing far more error events when ε is small.  run()
+    also uses the weights as a control variate (E_q[w] = 1); q ≈ 1/(2·rounds),
+    about one flip per trial, is a good choice.
+    `weights` holds the last batch's ratios and `ess` their effective
+    sample size.
+    """
+
+    def __init__(self, strat1, strat2, rounds=50, error=0.0, initial_state='CC',
+                 trials=10000, rng=None, antithetic=False, control_variate=False,
+                 importance_error=None):
+        self.strat1 = strat1
+        self.strat2 = strat2
+        self.rounds = rounds
+        self.error = error
+        self.initial_state = initial_state
+        self.trials = trials
+        self.rng = as_generator(rng)
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        if importance_error is not None and not (0 < error < 1 and 0 < importance_error < 1):
+            raise ValueError("Importance sampling needs 0 < error < 1 and 0 < importance_error < 1.")
+        self.importance_error = importance_error
+
+        # Determine max memory size (minimum 1)
+        self.max_memory = max(1, strat1.memory_size, strat2.memory_size)
+        self.table1 = compile_strategy(strat1, self.max_memory, state_to_last_moves)
+        self.table2 = compile_strategy(strat2, self.max_memory, state_to_last_moves_reversed)
+        self.start = state_index((initial_state,) * self.max_memory, self.max_memory)
+
+        # Which path run() took: "deterministic" (single exact trajectory) or "sampled"
+        self.path = None
+        self.se = None
+        self.variance_reduction = None
+        self.weights = None
+        self.ess = None
+
+    def _uniforms(self, stream, trials):
+        if self.antithetic:
+            u = stream.random(trials - trials // 2)
+            return np.concatenate([u, 1.0 - u[:trials // 2]])
+        return stream.random(trials)
+
+    def simulate(self, trials):
+        """
+        Play `trials` independent matches; returns per-trial score arrays
+        (likelihood-weighted under importance sampling).
+        """
+        return self.simulate_tracks(trials, [(self.table1, self.table2)])[0]
+
+    def simulate_tracks(self, trials, tracks):
+        """
+        Play every (table1, table2) pair in `tracks` on the *same* uniforms;
+        returns one (score1, score2) pair of per-trial arrays per track.
+        """
+        keep = 4 ** (self.max_memory - 1)
+        streams = [np.random.default_rng(seed) for seed in self.rng.integers(0, 2**63, size=4)]
+        # Deterministic tables need no draw for the intended move
+        draw1 = any(not t1.is_deterministic for t1, _ in tracks)
+        draw2 = any(not t2.is_deterministic for _, t2 in tracks)
+        noisy = self.error > 0
+        # Flip rate actually sampled, and per-trial log likelihood ratio
+        flip_rate = self.importance_error or self.error
+        log_weight = np.zeros(trials) if self.importance_error else None
+
+        runs = []
+        for t1, t2 in tracks:
+            runs.append({
+                "h": np.full(trials, self.start, dtype=np.int64),
+                "k1": np.full(trials, t1.initial, dtype=np.int64),
+                "k2": np.full(trials, t2.initial, dtype=np.int64),
+                "outcomes": np.empty((self.rounds, trials), dtype=np.int64),
+            })
+
+        for r in range(self.rounds):
+            u1 = self._uniforms(streams[0], trials) if draw1 else None
+            u2 = self._uniforms(streams[1], trials) if draw2 else None
+            if noisy:
+                flip1 = self._uniforms(streams[2], trials) < flip_rate
+                flip2 = self._uniforms(streams[3], trials) < flip_rate
+                if log_weight is not None:
+                    n_flips = flip1.astype(np.int64) + flip2
+                    log_weight += n_flips * np.log(self.error / flip_rate)
+                    log_weight += (2 - n_flips) * np.log((1 - self.error) / (1 - flip_rate))
+
+            for (t1, t2), run in zip(tracks, runs):
+                h = run["h"]
+                coop1, nxt1 = _lookup(t1, run["k1"], h)
+                coop2, nxt2 = _lookup(t2, run["k2"], h)
+
+                defect1 = coop1 == 0.0 if t1.is_deterministic else u1 >= coop1
+                defect2 = coop2 == 0.0 if t2.is_deterministic else u2 >= coop2
+                if noisy:
+                    defect1 ^= flip1
+                    defect2 ^= flip2
+
+                if nxt1 is not None:
+                    run["k1"] = nxt1
+                if nxt2 is not None:
+                    run["k2"] = nxt2
+
+                outcome = run["outcomes"][r]
+                np.add(2 * defect1, defect2, out=outcome)
+                run["h"] = (h % keep) * 4 + outcome
+
+        if log_weight is None:
+            self.weights = None
+            weight = 1.0
+        else:
+            weight = self.weights = np.exp(log_weight)
+            self.ess = float(weight.sum() ** 2 / (weight ** 2).sum())
+
+        # Payoffs in one gather per player: outcome digit → one-round payoff
+        return [(weight * PAYOFF1[run["outcomes"]].sum(axis=0),
+                 weight * PAYOFF2[run["outcomes"]].sum(axis=0))
+                for run in runs]
+
+    @property
+    def is_deterministic(self):
+        return self.error == 0 and self.table1.is_deterministic and self.table2.is_deterministic
+
+    def run(self):
+        # Deterministic strategies without noise: one trajectory is exact
+        if self.is_deterministic:
+            self.path = "deterministic"
+            score1, score2 = self.simulate(1)
+            self.se, self.variance_reduction = (0.0, 0.0), (1.0, 1.0)
+            return float(score1[0]), float(score2[0])
+        self.path = "sampled"
+
+        # Antithetic pairs need an even number of trials
+        trials = self.trials + (self.trials % 2 if self.antithetic else 0)
+        tracks = [(self.table1, self.table2)]
+        if self.control_variate:
+            tracks.append((memoryless(self.table1), memoryless(self.table2)))
+        results = self.simulate_tracks(trials, tracks)
+
+        if self.control_variate:
+            approx = outcome_probabilities(tracks[1][0].coop[0], tracks[1][1].coop[0], self.error)
+            control_means = expected_scores(approx, self.start, self.rounds)
+
+        means, se, reduction = [], [], []
+        for player in (0, 1):
+            y = scores = results[0][player]
+            if self.control_variate:
+                y = _control_adjusted(y, results[1][player], control_means[player])
+            if self.weights is not None:
+                # The likelihood ratio itself is a control with known mean 1;
+                # it removes the baseline score the weights would otherwise scale
+                y = _control_adjusted(y, self.weights, 1.0)
+            if self.antithetic:
+                half = len(y) // 2
+                pairs = (y[:half] + y[half:]) / 2
+                var = pairs.var(ddof=1) / half
+            else:
+                var = y.var(ddof=1) / len(y)
+
+            if self.weights is None:
+                plain_var = scores.var(ddof=1) / len(y)
+            else:
+                # Plain sampling variance at ε, Var_ε(Y) = E_q[w·(Y − μ)²],
+                # where the weighted scores are w·Y and μ the final estimate
+                raw = scores / self.weights
+                plain_var = (self.weights * (raw - y.mean()) ** 2).mean() / len(y)
+            means.append(float(y.mean()))
+            se.append(float(np.sqrt(var)))
+            # Round-off leftovers of an exact control count as zero variance
+            exact = var <= 1e-20 * max(plain_var, 1.0)
+            reduction.append(np.inf if exact else float(plain_var / var))
+            if exact:
+                se[-1] = 0.0
+
+        self.se, self.variance_reduction = tuple(se), tuple(reduction)
+        return means[0], means[1]
+
+    def run_adaptive(self, target_se=None, target_halfwidth=None, confidence=0.95,
+                     batch_size=250, min_trials=500, max_trials=100_000):
+        """
+        Sample in batches until both players' standard error is at most
+        `target_se` (or the `confidence` CI half-width at most
+        `target_halfwidth`), or `max_trials` is reached.  Means and variances
+        are merged batch by batch, so no per-trial scores are kept.  With
+        antithetic=True the batches are even and the running variance is
+        taken over pair means, the independent units.  control_variate needs
+        every trial to fit its coefficient and is only supported by run().
+
+        Returns (mean1, mean2, se1, se2, trials_used).
+        """
+        if (target_se is None) == (target_halfwidth is None):
+            raise ValueError("Give exactly one of target_se or target_halfwidth.")
+        if self.control_variate:
+            raise ValueError("control_variate is only supported by run(), not run_adaptive().")
+        if target_se is None:
+            target_se = target_halfwidth / NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        if self.is_deterministic:
+            self.path = "deterministic"
+            score1, score2 = self.simulate(1)
+            return float(score1[0]), float(score2[0]), 0.0, 0.0, 1
+        self.path = "sampled"
+
+        # Independent units: single trials, or antithetic pairs of two
+        unit = 2 if self.antithetic else 1
+        min_units, max_units = -(-min_trials // unit), max(max_trials // unit, 2)
+        batch_units = max(batch_size // unit, 1)
+
+        stats1, stats2 = RunningStats(), RunningStats()
+        batch = batch_units
+        while stats1.count < max_units:
+            n = min(batch, max_units - stats1.count)
+            score1, score2 = self.simulate(n * unit)
+            if self.antithetic:
+                score1 = (score1[:n] + score1[n:]) / 2
+                score2 = (score2[:n] + score2[n:]) / 2
+            stats1.update(score1)
+            stats2.update(score2)
+            if stats1.count >= min_units and max(stats1.se, stats2.se) <= target_se:
+                break
+            # Aim the next batch at the units the current variance says are
+            # still missing, but never more than double the sample at once
+            needed = max(stats1.variance, stats2.variance) / target_se ** 2 - stats1.count
+            batch = int(min(max(needed, batch_units), max(stats1.count, batch_units)))
+
+        return stats1.mean, stats2.mean, stats1.se, stats2.se, stats1.count * unit
+
+
+class CoupledNoiseSweep:
+    """
+    One Monte-Carlo pass for a whole grid of trembling-hand error rates.
+
+    Each trial, player and round draws a single uniform u, and the player
+    cooperates at error ε iff  u < (1 − ε)·p + ε·(1 − p),  p being the
+    intended cooperation probability.  The same u is thresholded for every ε
+    in `errors`, so the trajectories are coupled: the marginal at each ε is
+    exactly the usual noisy game, while differences between neighbouring ε
+    (payoff-vs-noise slopes) keep only the noise the extra errors cause.
+
+    run() returns arrays (score1[e], score2[e]) of mean payoffs per error
+    rate; `se` then holds the matching standard errors.
+    """
+
+    def __init__(self, strat1, strat2, errors, rounds=50, initial_state='CC',
+                 trials=10000, rng=None):
+        self.errors = np.asarray(errors, dtype=float)
+        self.rounds = rounds
+        self.trials = trials
+        self.rng = as_generator(rng)
+
+        self.max_memory = max(1, strat1.memory_size, strat2.memory_size)
+        self.table1 = compile_strategy(strat1, self.max_memory, state_to_last_moves)
+        self.table2 = compile_strategy(strat2, self.max_memory, state_to_last_moves_reversed)
+        self.start = state_index((initial_state,) * self.max_memory, self.max_memory)
+        self.se = None
+
+    def simulate(self, trials):
+        """Per-trial scores, each of shape (len(errors), trials)."""
+        keep = 4 ** (self.max_memory - 1)
+        shape = (len(self.errors), trials)
+        eps = self.errors[:, None]
+        stream1, stream2 = (np.random.default_rng(seed)
+                            for seed in self.rng.integers(0, 2**63, size=2))
+
+        h = np.full(shape, self.start, dtype=np.int64)
+        k1 = np.full(shape, self.table1.initial, dtype=np.int64)
+        k2 = np.full(shape, self.table2.initial, dtype=np.int64)
+        outcomes = np.empty((self.rounds, *shape), dtype=np.int64)
+
+        for r in range(self.rounds):
+            u1, u2 = stream1.random(trials), stream2.random(trials)
+            coop1, nxt1 = _lookup(self.table1, k1, h)
+            coop2, nxt2 = _lookup(self.table2, k2, h)
+            defect1 = u1 >= (1 - eps) * coop1 + eps * (1 - coop1)
+            defect2 = u2 >= (1 - eps) * coop2 + eps * (1 - coop2)
+            if nxt1 is not None:
+                k1 = nxt1
+            if nxt2 is not None:
+                k2 = nxt2
+            np.add(2 * defect1, defect2, out=outcomes[r])
+            h = (h % keep) * 4 + outcomes[r]
+
+        return PAYOFF1[outcomes].sum(axis=0), PAYOFF2[outcomes].sum(axis=0)
+
+    def run(self):
+        score1, score2 = self.simulate(self.trials)
+        n = score1.shape[1]
+        self.se = (score1.std(axis=1, ddof=1) / np.sqrt(n),
+                   score2.std(axis=1, ddof=1) / np.sqrt(n))
+        return score1.mean(axis=1), score2.mean(axis=1)
+
+def _control_adjusted(y, x, mean_x):
+    """Control-variate estimator per trial: y − β(x − E[x]), β = cov(y, x) / var(x)."""
+    var_x = x.var(ddof=1)
+    if var_x == 0:
+        return y
+    beta = np.cov(y, x, ddof=1)[0, 1] / var_x
+    return y - beta * (x - mean_x)
@@ -0,0 +1,153 @@
+# ──────────────────────────────────────────────────────────
+# File: Game/parallel.py
+# Author: Joshua Chua Han Wei – 32781555
+# Purpose: Round-robin matches spread over a process pool – strategies are
+#          shipped as FiniteStateTables, chunks are balanced by expected cost.
+# ──────────────────────────────────────────────────────────
+
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+from Utils.random_seed import seed_sequence
+from Strategies.fsm import compile_strategy, TableStrategy
+from Game.game import MarkovGame, MonteCarloGame
+from Game.montecarlo import VectorizedMonteCarloGame
+
+ENGINES = ("markov", "montecarlo", "montecarlo_vectorized")
+
+
+def match_seed(i, j, seed=None, common_random_numbers=False, crn_seed=0, per_match=False):
+    """
+    SeedSequence of match (i, j): the shared CRN seed, the pair's own key
+    under `seed`, or None (engine default, not reproducible).  per_match=True
+    falls back to the pair's key under the set_seed() root instead of None.
+    """
+    if common_random_numbers:
+        return np.random.SeedSequence(crn_seed)
+    if seed is not None or per_match:
+        return seed_sequence("match", i, j, seed=seed)
+    return None
+
+
+def match_generator(i, j, seed=None, common_random_numbers=False, crn_seed=0, per_match=False):
+    """Generator for match (i, j) built from match_seed(), or None."""
+    sequence = match_seed(i, j, seed, common_random_numbers, crn_seed, per_match)
+    return None if sequence is None else np.random.default_rng(sequence)
+
+
+def play_match(strat_i, strat_j, engine_type, rounds, trials, error, rng=None,
+               antithetic=False, control_variate=False):
+    """One match → (score_i, score_j, path, variance_reduction or None)."""
+    if engine_type == "markov":
+        game = MarkovGame(strat_i, strat_j, rounds=rounds, error=error)
+        score_i, score_j, _ = game.run()
+    elif engine_type == "montecarlo":
+        game = MonteCarloGame(strat_i, strat_j, rounds=rounds, trials=trials, error=error, rng=rng)
+        score_i, score_j = game.run()
+    elif engine_type == "montecarlo_vectorized":
+        game = VectorizedMonteCarloGame(
+            strat_i, strat_j, rounds=rounds, trials=trials, error=error, rng=rng,
+            antithetic=antithetic, control_variate=control_variate
+        )
+        score_i, score_j = game.run()
+    else:
+        raise ValueError(f"Unknown engine_type: {engine_type!r}")
+    path = getattr(game, "path", None) or engine_type
+    return score_i, score_j, path, getattr(game, "variance_reduction", None)
+
+
+def match_cost(table_i, table_j):
+    """Relative cost of a match: size of its (history × internal states) chain."""
+    m = max(table_i.memory_size, table_j.memory_size)
+    return 4 ** m * table_i.n_internal * table_j.n_internal
+
+
+def cost_chunks(pairs, costs, n_chunks):
+    """
+    Split `pairs` into about `n_chunks` chunks of similar total cost: most
+    expensive pairs first, each into the currently cheapest chunk.
+    """
+    n_chunks = max(1, min(n_chunks, len(pairs)))
+    chunks = [[] for _ in range(n_chunks)]
+    loads = np.zeros(n_chunks)
+    for p in np.argsort(costs, kind="stable")[::-1]:
+        c = int(np.argmin(loads))
+        chunks[c].append(pairs[p])
+        loads[c] += costs[p]
+    return [chunk for chunk in chunks if chunk]
+
+
+def compile_competitors(competitors):
+    """Per-seat tables of every competitor, each at its own memory."""
+    tables_1 = [compile_strategy(s, None, state_to_last_moves) for s in competitors]
+    tables_2 = [compile_strategy(s, None, state_to_last_moves_reversed) for s in competitors]
+    return tables_1, tables_2
+
+
+# Worker-process globals, filled once per process by the pool initializer
+_worker = {}
+
+
+def _init_worker(tables_1, tables_2, settings):
+    _worker.update(tables_1=tables_1, tables_2=tables_2, settings=settings)
+
+
+def _play_chunk(chunk):
+    tables_1, tables_2, settings = _worker["tables_1"], _worker["tables_2"], _worker["settings"]
+    crn = {k: settings[k] for k in ("seed", "common_random_numbers", "crn_seed")}
+    play = {k: settings[k] for k in ("engine_type", "rounds", "trials", "error",
+                                     "antithetic", "control_variate")}
+    results = []
+    for i, j in chunk:
+        rng = match_generator(i, j, per_match=True, **crn)
+        results.append(((i, j), play_match(TableStrategy(tables_1[i]), TableStrategy(tables_2[j]),
+                                           rng=rng, **play)))
+    return results
+
+
+def parallel_round_robin(competitors, workers, engine_type="markov", rounds=50, trials=10000,
+                         error=0.0, antithetic=False, control_variate=False,
+                         common_random_numbers=False, crn_seed=0, seed=None, pairs=None,
+                         chunks_per_worker=4):
+    """
+    Play every pair i < j (or just `pairs`) on `workers` processes; returns
+    {(i, j): result of play_match}.  Each match draws from its own (i, j)
+    stream (under `seed`, or the set_seed() root), so results do not depend
+    on the worker count or on how matches are chunked.
+    """
+    tables_1, tables_2 = compile_competitors(competitors)
+    settings = dict(engine_type=engine_type, rounds=rounds, trials=trials, error=error,
+                    antithetic=antithetic, control_variate=control_variate,
+                    common_random_numbers=common_random_numbers, crn_seed=crn_seed, seed=seed)
+
+    if pairs is None:
+        pairs = list(itertools.combinations(range(len(competitors)), 2))
+    if not pairs:
+        return {}
+    costs = [match_cost(tables_1[i], tables_2[j]) for i, j in pairs]
+    chunks = cost_chunks(pairs, costs, workers * chunks_per_worker)
+
+    if workers <= 1:
+        _init_worker(tables_1, tables_2, settings)
+        done = [_play_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tables_1, tables_2, settings)) as pool:
+            done = list(pool.map(_play_chunk, chunks))
+    return dict(itertools.chain.from_iterable(done))
+
+
+def map_replicates(run, jobs, workers):
+    """
+    [run(*job) for job in jobs] on `workers` forked processes, in job order.
+    Children are forked so they inherit the caller's state (e.g. a script's
+    settings) without re-importing it; with workers <= 1, or where fork is
+    unavailable, the jobs run serially.  `run` must seed itself from its job.
+    """
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [run(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("fork")) as pool:
+        return list(pool.map(run, *zip(*jobs)))
@@ -0,0 +1,33 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: Markov/horizon.py
+# Purpose: Finite-horizon sums of transition-matrix powers in O(log rounds).
+# ──────────────────────────────────────────────────────────
+
+import numpy as np
+
+def power_and_sum(matrix, n):
+    """
+    Returns (P^n, P^1 + P^2 + … + P^n) for a square transition matrix P,
+    using binary doubling on n (MSB first):
+
+        double   : S(2k)   = S(k) + S(k)·P^k ,   P^(2k)   = P^k · P^k
+        increment: S(k+1)  = S(k) + P^(k+1) ,    P^(k+1)  = P^k · P
+
+    so only O(log n) matrix products are needed.
+    """
+    if n < 0:
+        raise ValueError(f"Number of rounds must be non-negative, got {n}.")
+
+    size = matrix.shape[0]
+    power = np.eye(size)                  # P^k
+    total = np.zeros((size, size))        # S(k)
+
+    for bit in bin(n)[2:]:
+        total = total + total @ power
+        power = power @ power
+        if bit == "1":
+            power = power @ matrix
+            total = total + power
+
+    return power, total
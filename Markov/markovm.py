@@ -0,0 +1,143 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: Markov/markovm.py
+# Purpose: Generic 4^m × 4^m transition-matrix builder for memory-m games
+#          (base-4 shift-register state indexing, vectorised scatter).
+# ──────────────────────────────────────────────────────────
+
+from itertools import product
+import numpy as np
+from Utils.gamestates import states, state_to_last_moves, state_to_last_moves_reversed
+from Strategies.fsm import compile_strategy
+from Markov.utils import payoff_vectors
+#   A memory-m state is the last m outcomes (oldest first).  Each outcome is a
+#   base-4 digit  CC=0, CD=1, DC=2, DD=3  (index in `states`), so
+#       index(h_1, …, h_m) = h_1·4^(m-1) + … + h_m
+#   which is exactly the order of itertools.product(states, repeat=m).  The
+#   most recent outcome is the lowest digit, so the next state after outcome o
+#   is (index mod 4^(m-1))·4 + o.
+
+outcome_index = {s: i for i, s in enumerate(states)}
+
+def history_states(m):
+    """State list in index order: outcome strings for m = 1, m-tuples otherwise."""
+    if m == 1:
+        return list(states)
+    return list(product(states, repeat=m))
+
+def state_index(state, m):
+    """Base-4 index of a memory-m state ("CD" or ("CC","CD",…))."""
+    if isinstance(state, str):
+        state = (state,)
+    if len(state) != m:
+        raise ValueError(f"Expected a history of length {m}, got {state!r}.")
+    idx = 0
+    for outcome in state:
+        idx = idx * 4 + outcome_index[outcome]
+    return idx
+
+def shift_targets(m):
+    """(4^m, 4) array: next-state index for every (state, outcome) pair."""
+    size = 4 ** m
+    return (np.arange(size) % (size // 4))[:, None] * 4 + np.arange(4)[None, :]
+
+def policy_table(strategy, memory, view=state_to_last_moves):
+    """
+    Probability of cooperating in every memory-`memory` state, as seen through
+    `view` (state_to_last_moves for player 1, the reversed map for player 2).
+
+    The strategy is only queried on the 4^k histories of its own memory k and
+    the result is lifted to the larger space: a memory-k strategy only reads the
+    k most recent outcomes, i.e. the lowest k base-4 digits of the index.
+    Each history is queried from a fresh reset(), as in Strategy.to_bitstring().
+    """
+    table = compile_strategy(strategy, memory, view)
+    return table.coop[table.initial]
+
+def outcome_probabilities(coop1, coop2, error=0.0):
+    """
+    (…, n_states, 4) array of P(next outcome = CC/CD/DC/DD | state) given each
+    player's cooperation probabilities, after trembling-hand flips C↔D.
+    """
+    c1 = (1 - error) * coop1 + error * (1 - coop1)
+    c2 = (1 - error) * coop2 + error * (1 - coop2)
+    return np.stack([c1 * c2, c1 * (1 - c2), (1 - c1) * c2, (1 - c1) * (1 - c2)], axis=-1)
+
+def build_outcome_probabilities(strat1, strat2, error=0.0, memory=None):
+    """
+    Returns (probs, state_list) where probs[i, o] = P(next outcome o | state i).
+    Together with the shift-register rule this fully describes the chain, so
+    matrix-free engines never need the 4^m × 4^m matrix.
+
+    `memory` defaults to the larger memory of the two strategies (minimum 1);
+    lower-memory strategies are lifted into the larger state space.
+    """
+    m = memory or max(1, strat1.memory_size, strat2.memory_size)
+    coop1 = policy_table(strat1, m, state_to_last_moves)
+    coop2 = policy_table(strat2, m, state_to_last_moves_reversed)
+    return outcome_probabilities(coop1, coop2, error), history_states(m)
+
+def scatter_transition_matrix(probs, successors=None):
+    """
+    Dense matrix from (n_states, 4) outcome probabilities.  `successors`
+    defaults to the memory-m shift register (n_states == 4^m).
+    """
+    size = probs.shape[0]
+    if successors is None:
+        successors = shift_targets(size.bit_length() // 2)    # size == 4**m == 2**(2m)
+    # Each row has exactly four distinct successors; scatter them in one assignment
+    matrix = np.zeros((size, size))
+    matrix[np.repeat(np.arange(size), 4), successors.ravel()] = probs.ravel()
+    return matrix
+
+def propagate(distribution, probs):
+    """
+    Advance distribution(s) one round without building the matrix: O(4^m).
+    Works on any leading batch dimensions, i.e. distribution (..., 4^m) and
+    probs (..., 4^m, 4).
+
+    The mass leaving state i = d·4^(m-1) + r by outcome o lands on r·4 + o, so
+    after reshaping the flow to (…, d, r, o) we only have to fold out d.
+    """
+    size = distribution.shape[-1]
+    lead = distribution.shape[:-1]
+    flow = distribution[..., None] * probs
+    return flow.reshape(*lead, 4, size // 4, 4).sum(axis=-3).reshape(*lead, size)
+
+def propagate_successors(distribution, probs, successors):
+    """
+    General sparse step for chains with four successors per state (e.g. the
+    history × internal-state product chain): mass probs[..., i, o] moves from
+    state i to successors[..., i, o].  Leading batch dimensions are allowed.
+    """
+    size = distribution.shape[-1]
+    lead = distribution.shape[:-1]
+    flow = (distribution[..., None] * probs).reshape(-1, size * 4)
+    offsets = (np.arange(flow.shape[0]) * size)[:, None]
+    targets = (np.broadcast_to(successors, (*lead, size, 4)).reshape(-1, size * 4) + offsets)
+    out = np.bincount(targets.ravel(), weights=flow.ravel(), minlength=flow.shape[0] * size)
+    return out.reshape(*lead, size)
+
+def expected_scores(probs, start, rounds):
+    """
+    Expected cumulative payoffs (player 1, player 2) over `rounds` rounds from
+    history index `start`, using the shift-register fold (no matrix).
+    """
+    size = probs.shape[-2]
+    p_t = np.zeros(size)
+    p_t[start] = 1.0
+    visits = np.zeros(size)
+    for _ in range(rounds):
+        p_t = propagate(p_t, probs)
+        visits += p_t
+    payoff1, payoff2 = payoff_vectors(history_states(size.bit_length() // 2))
+    return float(visits @ payoff1), float(visits @ payoff2)
+
+def build_transition_matrix(strat1, strat2, error=0.0, memory=None):
+    """
+    Returns:
+      - A 4^m × 4^m numpy array M with M[i,j] = P(next state j | state i)
+      - The state list (see history_states) aligned with M's rows/columns.
+    """
+    probs, state_list = build_outcome_probabilities(strat1, strat2, error, memory)
+    return scatter_transition_matrix(probs), state_list
@@ -0,0 +1,56 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: Markov/product.py
+# Purpose: Product-automaton Markov chain for stateful strategies –
+#          state = (memory-m history, internal state of each player).
+# ──────────────────────────────────────────────────────────
+
+import numpy as np
+from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+from Strategies.fsm import compile_strategy
+from Markov.markovm import history_states, shift_targets, outcome_probabilities
+#   Product index of (history h, player-1 state k1, player-2 state k2):
+#       (h·K1 + k1)·K2 + k2
+#   Internal states move deterministically given (k, h); the history shifts in
+#   the sampled outcome, so every product state still has four successors.
+
+def product_chain(coop1, next1, coop2, next2, error=0.0):
+    """
+    Outcome probabilities and successor indices of the product chain from
+    FSM tables coop/next of shape (..., K, 4^m); leading dimensions are
+    batched.  Returns (probs, successors), both (..., 4^m·K1·K2, 4).
+    """
+    k1, size = coop1.shape[-2:]
+    k2 = coop2.shape[-2]
+    m = size.bit_length() // 2
+    lead = np.broadcast_shapes(coop1.shape[:-2], coop2.shape[:-2])
+
+    # Arrange everything on a (..., h, k1, k2, outcome) grid
+    c1 = np.swapaxes(coop1, -1, -2)[..., :, :, None]
+    c2 = np.swapaxes(coop2, -1, -2)[..., :, None, :]
+    probs = outcome_probabilities(c1, c2, error)
+
+    n1 = np.swapaxes(next1, -1, -2)[..., :, :, None, None]
+    n2 = np.swapaxes(next2, -1, -2)[..., :, None, :, None]
+    h_next = shift_targets(m)[:, None, None, :]
+    successors = (h_next * k1 + n1) * k2 + n2
+
+    shape = (*lead, size * k1 * k2, 4)
+    return (np.broadcast_to(probs, (*lead, size, k1, k2, 4)).reshape(shape),
+            np.broadcast_to(successors, (*lead, size, k1, k2, 4)).reshape(shape))
+
+def product_states(m, k1, k2):
+    """State list aligned with product_chain: (history state, k1, k2)."""
+    return [(h, a, b) for h in history_states(m) for a in range(k1) for b in range(k2)]
+
+def build_product_chain(strat1, strat2, error=0.0, memory=None):
+    """
+    Returns (probs, successors, state_list, (table1, table2)) for two
+    (possibly stateful) strategies; the FiniteStateTables carry each
+    player's number of internal states and the one it starts in.
+    """
+    m = memory or max(1, strat1.memory_size, strat2.memory_size)
+    t1 = compile_strategy(strat1, m, state_to_last_moves)
+    t2 = compile_strategy(strat2, m, state_to_last_moves_reversed)
+    probs, successors = product_chain(t1.coop, t1.next_internal, t2.coop, t2.next_internal, error)
+    return probs, successors, product_states(m, t1.n_internal, t2.n_internal), (t1, t2)
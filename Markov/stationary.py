@@ -0,0 +1,121 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: Markov/stationary.py
+# Purpose: Stationary / long-run (infinite-horizon) distribution of a
+#          transition matrix via linear solves and class decomposition.
+# ──────────────────────────────────────────────────────────
+
+import math
+from collections import deque
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+def _solve(a, b):
+    # Fall back to least squares when the system is numerically singular
+    try:
+        return np.linalg.solve(a, b)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(a, b, rcond=None)[0]
+
+def communicating_classes(matrix):
+    """
+    Decompose the chain into communicating classes.
+    Returns (classes, closed) where `classes` is a list of index arrays and
+    closed[c] is True when no probability leaves class c (a recurrent class).
+    """
+    edges = matrix > 0
+    n_classes, labels = connected_components(csr_matrix(edges), directed=True,
+                                             connection="strong")
+    classes = [np.flatnonzero(labels == c) for c in range(n_classes)]
+    closed = []
+    for members in classes:
+        leaving = edges[members][:, labels != labels[members[0]]]
+        closed.append(not leaving.any())
+    return classes, closed
+
+def period(matrix, members):
+    """
+    Period of an irreducible class: gcd over its internal edges u→v of
+    level(u) + 1 − level(v), where level is the BFS depth from one member.
+    """
+    sub = matrix[np.ix_(members, members)] > 0
+    level = np.full(len(members), -1)
+    level[0] = 0
+    queue = deque([0])
+    g = 0
+    while queue:
+        u = queue.popleft()
+        for v in np.flatnonzero(sub[u]):
+            if level[v] < 0:
+                level[v] = level[u] + 1
+                queue.append(v)
+            else:
+                g = math.gcd(g, int(level[u] + 1 - level[v]))
+    return g if g > 0 else 1
+
+def stationary_distribution(matrix):
+    """
+    Stationary distribution π (π·P = π, Σπ = 1) of an irreducible chain,
+    obtained from one linear solve with the last balance equation replaced
+    by the normalisation constraint.
+    """
+    size = matrix.shape[0]
+    a = matrix.T - np.eye(size)
+    a[-1, :] = 1.0
+    b = np.zeros(size)
+    b[-1] = 1.0
+    pi = np.clip(_solve(a, b), 0.0, None)
+    return pi / pi.sum()
+
+def long_run_distribution(matrix, initial_distribution):
+    """
+    Long-run (Cesàro) average distribution lim (1/T) Σ_t p_0·P^t for any chain.
+
+    • each closed class c gets its own stationary distribution π_c;
+    • transient states are absorbed into closed classes with probabilities
+      B = (I − Q)^(-1)·R, so class c receives weight p_0[c] + p_0[T]·B[:, c].
+
+    Periodic classes are handled too: p_t itself does not converge there, but
+    its time average does and equals π_c.  Returns (distribution, info) where
+    info lists the classes, which are closed, their periods and weights.
+    """
+    classes, closed = communicating_classes(matrix)
+    size = matrix.shape[0]
+    recurrent = [members for members, is_closed in zip(classes, closed) if is_closed]
+    transient = np.concatenate(
+        [members for members, is_closed in zip(classes, closed) if not is_closed]
+        or [np.array([], dtype=int)]
+    )
+
+    # Absorption probabilities of transient states into each closed class
+    if len(transient):
+        q = matrix[np.ix_(transient, transient)]
+        r = np.column_stack([matrix[np.ix_(transient, members)].sum(axis=1)
+                             for members in recurrent])
+        absorb = _solve(np.eye(len(transient)) - q, r)
+        transient_mass = initial_distribution[transient] @ absorb
+    else:
+        transient_mass = np.zeros(len(recurrent))
+
+    distribution = np.zeros(size)
+    periods, weights = [], []
+    for c, members in enumerate(recurrent):
+        weight = initial_distribution[members].sum() + transient_mass[c]
+        if len(members) == 1:
+            pi_c = np.ones(1)
+        else:
+            pi_c = stationary_distribution(matrix[np.ix_(members, members)])
+        distribution[members] += weight * pi_c
+        periods.append(period(matrix, members))
+        weights.append(weight)
+
+    info = {
+        "classes": classes,
+        "closed": closed,
+        "recurrent": recurrent,
+        "periods": periods,
+        "weights": weights,
+        "periodic": any(p > 1 for p in periods),
+    }
+    return distribution, info
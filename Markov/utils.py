@@ -1,8 +1,24 @@
 # ──────────────────────────────────────────────────────────
 # Author: Joshua Chua Han Wei – 32781555
 # File: Markov/utils.py
-# Purpose: Small helper(s) for state-to-move mapping (e.g. flipped view).
+# Purpose: Small helper(s) for state-to-move mapping (e.g. flipped view)
+#          and per-state payoff vectors.
 # ──────────────────────────────────────────────────────────
+import numpy as np
+from Utils.payoff_matrix import payoff_matrix
+
 def flipped_state_to_last_moves(st, state_to_last_moves):
             a, b = state_to_last_moves(st)
-            return (b, a)
\ No newline at end of file
+            return (b, a)
+
+def payoff_vectors(states):
+    """
+    Returns (payoff1, payoff2): numpy arrays aligned with `states` holding each
+    player's one-round payoff for the most recent outcome of every state.
+    Memory-1 states are outcome strings ("CD"); memory-m states are tuples whose
+    last entry is the most recent outcome.
+    """
+    last_rounds = [state if isinstance(state, str) else state[-1] for state in states]
+    payoff1 = np.array([payoff_matrix[o][0] for o in last_rounds], dtype=float)
+    payoff2 = np.array([payoff_matrix[o][1] for o in last_rounds], dtype=float)
+    return payoff1, payoff2
@@ -5,18 +5,47 @@
 # ──────────────────────────────────────────────────────────
 
 import math
+import random
 from itertools import product
+import numpy as np
 from Utils.gamestates import states            # ["CC","CD","DC","DD"]
 from Strategies.strategy import Strategy
 
 
+# One pair of index tables per memory m, shared by every chromosome:
+#   history_to_index  – char-pair history (('C','C'),('D','C'),…) → index
+#   fast index        – every hashable history form next_move() accepts
+_INDEX_TABLES = {}
+
+
+def index_tables(m):
+    """(history_to_index, fast index) for memory m, built once."""
+    tables = _INDEX_TABLES.get(m)
+    if tables is None:
+        history_to_index, fast = {}, {}
+        for idx, hist in enumerate(product(states, repeat=m)):
+            # hist ('CC','DC',…) → (('C','C'),('D','C'),…)
+            pairs = tuple((s[0], s[1]) for s in hist)
+            history_to_index[pairs] = idx
+            fast[pairs] = fast[hist] = idx
+            if m == 1:
+                fast[hist[0]] = fast[pairs[0]] = idx     # "CD" and ('C','D')
+        tables = _INDEX_TABLES[m] = (history_to_index, fast)
+    return tables
+
+
 class ChromosomeStrategy(Strategy):
     """
     Strategy encoded as a bit-string of length 4**m.
     Bit 0 → 'C', 1 → 'D'.  The index is determined by the last-m outcomes
     (each outcome ∈ {"CC","CD","DC","DD"}).
+
+    The genome is packed into one integer (bit i = move after history i), so
+    construction, mutation and lookup never build per-object tables.
     """
 
+    __slots__ = ("name", "is_nice", "memory_size", "genome")
+
     # ------------------------------------------------------------------ #
     # constructor
     # ------------------------------------------------------------------ #
@@ -25,43 +54,73 @@ class ChromosomeStrategy(Strategy):
         self.name = "ChromosomeStrategy"
         self.is_nice = None          # set externally later
 
-        # 1) normalise chromosome to list[int]
-        if isinstance(chromosome, str):
-            chromosome = [int(bit) for bit in chromosome]
-        length = len(chromosome)
+        # 1) normalise chromosome (str or sequence of ints) to a '0'/'1' string
+        bits = "".join("0" if int(bit) == 0 else "1" for bit in chromosome)
+        length = len(bits)
 
         # 2) infer memory size m  (length must be 4**m)
-        m_float = math.log(length, 4)
-        if not m_float.is_integer():
+        m_float = math.log(length, 4) if length else None
+        if m_float is None or not m_float.is_integer():
             raise ValueError(
                 f"Chromosome length {length} is not a power of 4 "
                 "(i.e. not 4**m for any integer m)."
             )
         self.memory_size = int(m_float)
 
-        # 3) build lookup table
-        self.lookup_table = ["C" if bit == 0 else "D" for bit in chromosome]
+        # 3) pack: bit i of the genome is chromosome[i]
+        self.genome = int(bits[::-1], 2)
 
-        # 4) pre-compute mapping: history tuple → index
-        self.history_to_index = {}
-        for idx, hist in enumerate(product(states, repeat=self.memory_size)):
-            # hist ('CC','DC',…) → (('C','C'),('D','C'),…)
-            key = tuple((s[0], s[1]) for s in hist)
-            self.history_to_index[key] = idx
+    @classmethod
+    def from_genome(cls, genome, memory_size, name="ChromosomeStrategy", is_nice=None):
+        """Chromosome from a packed genome, without parsing a bit-string."""
+        chrom = cls.__new__(cls)
+        chrom.name = name
+        chrom.is_nice = is_nice
+        chrom.memory_size = memory_size
+        chrom.genome = genome
+        return chrom
+
+    @property
+    def length(self):
+        return 4 ** self.memory_size
+
+    @property
+    def lookup_table(self):
+        return ["D" if (self.genome >> i) & 1 else "C" for i in range(self.length)]
+
+    @property
+    def history_to_index(self):
+        return index_tables(self.memory_size)[0]
 
     # ------------------------------------------------------------------ #
     # Strategy API
     # ------------------------------------------------------------------ #
-    def next_move(self, last_state, state_matrix):
+    def move_at(self, index):
+        """Move after the history with base-4 index `index` (CC=0 … DD=3)."""
+        return "D" if (self.genome >> index) & 1 else "C"
+
+    def next_move(self, last_state, state_matrix=None):
         """
         Accepts `last_state` in any of these forms:
 
+        • 7                                  — integer history index (fast path)
         • "CC"                               — outcome string
         • ("CC","DC",…)                      — tuple/list of outcome strings
         • (('C','C'),('D','C'),…)            — tuple of char-pairs
         • ('C','D') when m == 1              — two single-char strings
-        """
 
+        Histories longer than m are cut to their last m outcomes.
+        """
+        if isinstance(last_state, (int, np.integer)):
+            return self.move_at(last_state)
+        if isinstance(last_state, list):
+            last_state = tuple(last_state)
+        idx = index_tables(self.memory_size)[1].get(last_state)
+        if idx is None:
+            idx = self._slow_index(last_state)
+        return "D" if (self.genome >> idx) & 1 else "C"
+
+    def _slow_index(self, last_state):
         # 1) convert to flat tuple  `seq`
         if isinstance(last_state, str):
             seq = (last_state,)
@@ -72,12 +131,7 @@ class ChromosomeStrategy(Strategy):
             # memory-1 special case: ('C','D') → ('CD',)
             seq = ("".join(last_state),)
 
-        elif (isinstance(last_state, (list, tuple))
-              and all(isinstance(s, str) for s in last_state)):
-            seq = tuple(last_state)
-
         else:
-            # assume tuple of char-pairs already
             seq = tuple(last_state)
 
         # 2) keep only last m entries
@@ -100,11 +154,28 @@ class ChromosomeStrategy(Strategy):
                     "Expected outcome string 'CD' or 2-char tuple ('C','D')."
                 )
 
-        key = tuple(normalized)
-        idx = self.history_to_index[key]
-        return self.lookup_table[idx]
+        return self.history_to_index[tuple(normalized)]
 
     def move_probabilities(self, last_state, state_matrix):
         move = self.next_move(last_state, state_matrix)
         return {"C": 1.0 if move == "C" else 0.0,
                 "D": 1.0 if move == "D" else 0.0}
+
+    def to_bitstring(self):
+        """The chromosome itself – no replay of histories needed."""
+        return [(self.genome >> i) & 1 for i in range(self.length)]
+
+    def mutated(self, mu, rand=random.random):
+        """
+        Child with each bit flipped with probability `mu`: one rand() draw
+        per bit, in index order, XOR-ed into the packed genome.
+        """
+        mask = 0
+        for i in range(self.length):
+            if rand() < mu:
+                mask |= 1 << i
+        return ChromosomeStrategy.from_genome(self.genome ^ mask, self.memory_size)
+
+    def fingerprint(self):
+        """Cache identity: the genome alone (names are assigned externally)."""
+        return ("ChromosomeStrategy", self.memory_size, self.genome)
@@ -0,0 +1,194 @@
+# ──────────────────────────────────────────────────────────
+# File   : Strategies/fsm.py
+# Author : Joshua Chua Han Wei – 32781555
+# Purpose: Finite-state-machine (lookup-table) form of any strategy – history
+#          window plus internal flags – for exact Markov / array engines.
+# ──────────────────────────────────────────────────────────
+
+from itertools import product
+import random
+import numpy as np
+from Utils.gamestates import states, state_to_last_moves
+
+
+class FiniteStateTable:
+    """
+    One seat's view of a strategy as a finite-state machine over
+    (internal state k, memory-m history index h):
+
+    • coop[k, h]          – probability of cooperating
+    • next_internal[k, h] – internal state after moving (deterministic)
+    • initial             – internal state right after reset()
+
+    Stateless strategies have a single internal state.  Tables are plain
+    NumPy arrays, so they are cheap to pickle and to stack into batches.
+    """
+
+    __slots__ = ("name", "memory_size", "coop", "next_internal", "initial")
+
+    def __init__(self, name, memory_size, coop, next_internal, initial=0):
+        self.name = name
+        self.memory_size = memory_size
+        self.coop = coop
+        self.next_internal = next_internal
+        self.initial = initial
+
+    @property
+    def n_internal(self):
+        return self.coop.shape[0]
+
+    @property
+    def is_stateful(self):
+        return self.n_internal > 1
+
+    @property
+    def is_deterministic(self):
+        return bool(np.all((self.coop == 0.0) | (self.coop == 1.0)))
+
+    def padded(self, n_internal):
+        """Copy with unreachable extra internal states, for stacking tables."""
+        extra = n_internal - self.n_internal
+        if extra <= 0:
+            return self
+        coop = np.vstack([self.coop, np.repeat(self.coop[:1], extra, axis=0)])
+        stay = np.arange(self.n_internal, n_internal)[:, None].repeat(self.coop.shape[1], axis=1)
+        next_internal = np.vstack([self.next_internal, stay])
+        return FiniteStateTable(self.name, self.memory_size, coop, next_internal, self.initial)
+
+
+def is_stateful(strategy):
+    return len(strategy.internal_states) > 1
+
+
+_UNFROZEN = object()
+
+
+def _frozen(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        items = tuple(_frozen(v) for v in value)
+        return _UNFROZEN if any(v is _UNFROZEN for v in items) else items
+    return _UNFROZEN
+
+
+def strategy_fingerprint(strategy):
+    """
+    Hashable identity of a strategy's behaviour, for caches: its own
+    fingerprint() if it has one, else its class plus every plain attribute
+    (name, niceness and the internal flags reset() restores are left out).
+    None when some attribute is not a plain value – such strategies are
+    never cached.
+    """
+    own = getattr(strategy, "fingerprint", None)
+    if own is not None:
+        return own()
+    skip = {"name", "is_nice", *getattr(strategy, "internal_fields", ())}
+    items = []
+    for key, value in sorted(vars(strategy).items()):
+        if key in skip:
+            continue
+        value = _frozen(value)
+        if value is _UNFROZEN:
+            return None
+        items.append((key, value))
+    cls = type(strategy)
+    return (cls.__module__, cls.__qualname__, tuple(items))
+
+
+def compile_strategy(strategy, memory=None, view=state_to_last_moves):
+    """
+    Tabulate `strategy` as seen through `view` (state_to_last_moves for
+    player 1, the reversed map for player 2) as a FiniteStateTable over
+    memory-`memory` histories.
+
+    For every internal state listed in `strategy.internal_states` the
+    attributes named in `strategy.internal_fields` are set, the strategy is
+    queried once per history of its own memory k, and the attribute values it
+    is left with give the successor internal state.  The k-history tables are
+    then lifted to 4^memory columns: a memory-k strategy only reads the lowest
+    k base-4 digits of the history index.
+    """
+    k_own = max(1, strategy.memory_size)
+    memory = memory or k_own
+    if k_own > memory:
+        raise ValueError(f"{strategy.name} needs memory {k_own} but the game only tracks {memory}.")
+
+    fields = tuple(strategy.internal_fields)
+    internal = [tuple(values) for values in strategy.internal_states]
+    lookup = {values: k for k, values in enumerate(internal)}
+
+    coop = np.empty((len(internal), 4 ** k_own))
+    next_internal = np.empty((len(internal), 4 ** k_own), dtype=np.int64)
+    for k, values in enumerate(internal):
+        for h, history in enumerate(product(states, repeat=k_own)):
+            strategy.reset()
+            for field, value in zip(fields, values):
+                setattr(strategy, field, value)
+            coop[k, h] = strategy.move_probabilities(history, view)["C"]
+            after = tuple(getattr(strategy, field) for field in fields)
+            if after not in lookup:
+                raise ValueError(
+                    f"{strategy.name} reached internal state {dict(zip(fields, after))} "
+                    "which is not listed in internal_states."
+                )
+            next_internal[k, h] = lookup[after]
+
+    strategy.reset()
+    initial = lookup[tuple(getattr(strategy, field) for field in fields)]
+
+    lift = np.arange(4 ** memory) % (4 ** k_own)
+    return FiniteStateTable(strategy.name, memory, coop[:, lift], next_internal[:, lift], initial)
+
+
+class TableStrategy:
+    """
+    Strategy stand-in rebuilt from a FiniteStateTable (e.g. inside a worker
+    process), so every engine can run it unchanged.  The table already fixes
+    the seat's view, so the `state_matrix` argument is ignored – use it only
+    in the seat it was compiled for.  compile_strategy() of a TableStrategy
+    returns the same table.  It has no is_nice: niceness belongs to the
+    original strategy, so read it there.
+    """
+
+    internal_fields = ("k",)
+
+    def __init__(self, table):
+        self.table = table
+        self.name = table.name
+        self.memory_size = table.memory_size
+        self.internal_states = [(k,) for k in range(table.n_internal)]
+        # Plain lists and a history → index memo keep the per-round lookup cheap
+        self._coop = table.coop.tolist()
+        self._next = table.next_internal.tolist()
+        self._index = {}
+        self.reset()
+
+    def reset(self):
+        self.k = self.table.initial
+
+    def fingerprint(self):
+        t = self.table
+        return ("table", t.memory_size, t.initial, t.coop.shape,
+                t.coop.tobytes(), t.next_internal.tobytes())
+
+    def _history_index(self, last_state):
+        h = 0
+        for outcome in last_state[len(last_state) - self.memory_size:]:
+            h = h * 4 + states.index(outcome)
+        self._index[last_state] = h
+        return h
+
+    def move_probabilities(self, last_state, _):
+        h = self._index.get(last_state)
+        if h is None:
+            h = self._history_index(last_state)
+        p = self._coop[self.k][h]
+        self.k = self._next[self.k][h]
+        return {"C": p, "D": 1.0 - p}
+
+    def next_move(self, last_state, state_matrix, rng=None):
+        # rng: source with .random() – numpy Generator or random.Random –
+        # to draw from (default: the global `random`)
+        draw = random.random() if rng is None else rng.random()
+        return "C" if draw < self.move_probabilities(last_state, state_matrix)["C"] else "D"
@@ -40,8 +40,11 @@ class RandomStrategy(Strategy):
         self.memory_size = 0                                 # ignores history, fixed probability
         self.coop_prob = coop_prob                           # probability to cooperate
 
-    def next_move(self, _, __):
-        return "C" if random.random() < self.coop_prob else "D"
+    def next_move(self, _, __, rng=None):
+        # rng: source with .random() – numpy Generator or random.Random –
+        # to draw from (default: the global `random`)
+        draw = random.random() if rng is None else rng.random()
+        return "C" if draw < self.coop_prob else "D"
 
     def move_probabilities(self, _, __):
         return {"C": self.coop_prob, "D": 1 - self.coop_prob}
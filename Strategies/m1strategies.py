@@ -60,6 +60,9 @@ class ReverseTitForTat(Strategy):
         return {"C": 1.0 if intended == "C" else 0.0, "D": 1.0 if intended == "D" else 0.0}
     
 class GrimTrigger(Strategy):
+    internal_fields = ("triggered",)
+    internal_states = [(False,), (True,)]
+
     def __init__(self):
         self.name = "GrimTrigger"
         self.is_nice = False
@@ -127,6 +127,10 @@ class SuspiciousTf2T(Strategy):
 
 
 class Prober(Strategy):
+    # (round_counter, detected_punishment); detection only happens once probing is over
+    internal_fields = ("round_counter", "detected_punishment")
+    internal_states = [(0, False), (1, False), (2, False), (3, False), (3, True)]
+
     def __init__(self):
         self.name = "Prober"
         self.is_nice = False
@@ -163,6 +167,9 @@ class Prober(Strategy):
 
 
 class Grim2(Strategy):
+    internal_fields = ("triggered",)
+    internal_states = [(False,), (True,)]
+
     def __init__(self):
         self.name = "Grim2"
         self.is_nice = False
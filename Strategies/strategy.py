@@ -10,6 +10,15 @@ from itertools import product
 from Utils.gamestates import states, state_to_last_moves
 
 class Strategy:
+    # Finite-state-machine description of flags carried between rounds (see
+    # Strategies/fsm.py): attribute names, and every tuple of values they can
+    # take.  Stateless strategies keep the single empty state.
+    internal_fields = ()
+    internal_states = [()]
+    # No per-instance dict unless a subclass wants one (ChromosomeStrategy
+    # declares its own slots; the hand-coded strategies keep a __dict__)
+    __slots__ = ()
+
     def __init__(self):
         self.name = "BaseStrategy"
         self.is_nice = True
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from Strategies.chromosomes import ChromosomeStrategy
+from Strategies.m0strategies import AlwaysDefect, RandomStrategy
+from Strategies.m1strategies import TitForTat, ReverseTitForTat, GrimTrigger
+from Strategies.m2strategies import Pavlov2, Prober
+from Strategies.m3strategies import Pavlov3, Generous3
+
+
+# Shared tournament fields.  Each fixture is a factory, so a test can build
+# fresh (unplayed, freshly reset) strategy objects as often as it needs.
+
+@pytest.fixture
+def field():
+    """
+    Mixed hand-coded field: memory 0–3, random, stateful (GrimTrigger,
+    Prober).  Indices 2, 3 are memory-1 and 7, 8 memory-3; no two members
+    compile to the same tables.
+    """
+    def make():
+        return [AlwaysDefect(), RandomStrategy(0.5), TitForTat(), ReverseTitForTat(),
+                GrimTrigger(), Pavlov2(), Prober(), Pavlov3(), Generous3()]
+    return make
+
+
+@pytest.fixture
+def population():
+    """GA-style population: five hand-coded strategies, then three chromosomes."""
+    def make():
+        pop = [TitForTat(), ReverseTitForTat(), GrimTrigger(), Pavlov2(), Prober()]
+        pop += [ChromosomeStrategy(bits) for bits in ("0110", "1001", "0000")]
+        for c in pop[5:]:
+            c.name = "Chrom"                    # clashing names must not matter
+        return pop
+    return make
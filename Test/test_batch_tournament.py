@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import itertools
+import pytest
+import numpy as np
+
+from Game.game import MarkovGame
+from Game.batch import batched_markov_payoffs
+from Strategies.m0strategies import AlwaysDefect, RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, ReverseTitForTat, GrimTrigger
+from Strategies.m2strategies import (
+    TitForTwoTats, Pavlov2, GenerousTwoTitForTwo, SuspiciousTf2T, Prober, Grim2
+)
+from Strategies.m3strategies import (
+    TwoForgiveOnePunish, ThreeGrudger, PatternFollower3,
+    Pavlov3, Generous3, UnforgivingPatternHunter
+)
+
+
+def make_competitors():
+    return [
+        AlwaysDefect(), RandomStrategy(0.5),
+        TitForTat(), WinStayLoseShift(), ReverseTitForTat(),
+        TitForTwoTats(), Pavlov2(), GenerousTwoTitForTwo(), SuspiciousTf2T(),
+        TwoForgiveOnePunish(), ThreeGrudger(), PatternFollower3(),
+        Pavlov3(), Generous3(), UnforgivingPatternHunter(),
+    ]
+
+
+@pytest.mark.parametrize("error", [0.0, 0.05])
+def test_batched_kernel_matches_pairwise_markov(error):
+    competitors = make_competitors()
+    batched = batched_markov_payoffs(competitors, rounds=50, error=error, batch_size=16)
+
+    assert np.isnan(np.diag(batched)).all()
+    for i, j in itertools.combinations(range(len(competitors)), 2):
+        score_i, score_j, _ = MarkovGame(competitors[i], competitors[j],
+                                         rounds=50, error=error).run()
+        assert batched[i, j] == pytest.approx(score_i, abs=1e-9)
+        assert batched[j, i] == pytest.approx(score_j, abs=1e-9)
+
+
+def test_batched_kernel_with_stateful_strategies():
+    competitors = [GrimTrigger(), Prober(), Grim2(), TitForTat(), RandomStrategy(0.7), Pavlov3()]
+    batched = batched_markov_payoffs(competitors, rounds=50, error=0.03)
+    for i, j in itertools.combinations(range(len(competitors)), 2):
+        score_i, score_j, _ = MarkovGame(competitors[i], competitors[j],
+                                         rounds=50, error=0.03).run()
+        assert batched[i, j] == pytest.approx(score_i, abs=1e-9)
+        assert batched[j, i] == pytest.approx(score_j, abs=1e-9)
+
+
+def test_batched_kernel_on_selected_pairs():
+    competitors = make_competitors()
+    full = batched_markov_payoffs(competitors, rounds=50, error=0.05)
+    pairs = [(0, 14), (3, 7), (12, 13)]
+    part = batched_markov_payoffs(competitors, rounds=50, error=0.05, pairs=pairs, batch_size=2)
+    for i, j in pairs:
+        assert (part[i, j], part[j, i]) == pytest.approx((full[i, j], full[j, i]), abs=1e-9)
+    assert np.isfinite(part).sum() == 2 * len(pairs)
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -8,7 +8,10 @@ from Strategies.chromosomes import ChromosomeStrategy
 
 import pytest
 import math
+import random
+from itertools import product
 from Strategies.chromosomes import ChromosomeStrategy
+from Utils.gamestates import states
 
 # 1. MEMORY‐1 (m = 1).  Here 4**1 = 4 bits.
 #    Let’s pick chromosome = "0101" → bit‐list = [0,1,0,1].
@@ -192,6 +195,30 @@ def test_randomized_spot_check_memory2():
         assert cs_rand.next_move(hist, None) == move_expected
 
 
+# 6. Packed genome: integer-index fast path, shared index tables, slots,
+#    and mutation straight on the genome.
+def test_packed_genome_fast_paths():
+    bits = [random.Random(3).randint(0, 1) for _ in range(16)]
+    cs = ChromosomeStrategy(bits)
+    other = ChromosomeStrategy("0" * 16)
+
+    assert cs.to_bitstring() == bits
+    assert cs.history_to_index is other.history_to_index       # one table per m
+    assert not hasattr(cs, "__dict__")
+    for idx, hist in enumerate(product(states, repeat=2)):
+        assert cs.next_move(idx, None) == cs.next_move(hist, None) == ("D" if bits[idx] else "C")
+
+    twin = ChromosomeStrategy.from_genome(cs.genome, cs.memory_size)
+    assert twin.to_bitstring() == bits
+
+    assert cs.mutated(0.0).to_bitstring() == bits
+    assert cs.mutated(1.0).to_bitstring() == [1 - b for b in bits]
+    draws = iter([0.9, 0.1] * 8)                               # flip every odd bit
+    child = cs.mutated(0.5, rand=lambda: next(draws))
+    assert child.to_bitstring() == [b ^ (i % 2) for i, b in enumerate(bits)]
+    assert cs.to_bitstring() == bits                           # parent untouched
+
+
 # ======= RUN THESE TESTS WITH:  pytest -q test_chromosome_strategy.py  =======
 
 if __name__ == "__main__":
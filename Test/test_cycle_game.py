@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from Game.game import CycleGame, MarkovGame
+from Strategies.m0strategies import AlwaysDefect, RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, ReverseTitForTat
+from Strategies.m2strategies import SuspiciousTf2T, Prober
+from Strategies.m3strategies import Pavlov3, PatternFollower3
+
+
+@pytest.mark.parametrize("make1, make2", [
+    (TitForTat, AlwaysDefect),
+    (WinStayLoseShift, ReverseTitForTat),
+    (TitForTat, SuspiciousTf2T),
+    (Prober, Pavlov3),
+    (PatternFollower3, ReverseTitForTat),
+])
+@pytest.mark.parametrize("rounds", [1, 3, 50, 137])
+def test_cycle_totals_match_markov(make1, make2, rounds):
+    cycle = CycleGame(make1(), make2(), rounds=rounds).run()
+    exact = MarkovGame(make1(), make2(), rounds=rounds).run()
+    assert cycle == pytest.approx(exact[:2])
+
+
+def test_cycle_metadata():
+    game = CycleGame(TitForTat(), TitForTat(), rounds=10**9)
+    assert game.run() == (3e9, 3e9)
+    assert game.prefix == [] and game.cycle == ["CC"]
+    assert game.describe_cycle() == "CC forever"
+
+    game = CycleGame(TitForTat(), TitForTat(), initial_state="CD")
+    game.run()
+    assert game.cycle == ["DC", "CD"]
+
+
+def test_tft_vs_always_defect_pre_period():
+    game = CycleGame(TitForTat(), AlwaysDefect(), rounds=10**9)
+    assert game.run() == (10**9 - 1, 10**9 + 4)
+    assert game.prefix == ["CD"] and game.cycle == ["DD"]
+
+
+def test_stochastic_strategy_rejected():
+    with pytest.raises(ValueError):
+        CycleGame(TitForTat(), RandomStrategy(0.5))
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import socket
+import threading
+import pytest
+import numpy as np
+
+from Game.distributed import (
+    Coordinator, serve_worker, send_message, recv_message, table_to_dict, table_from_dict
+)
+from Game.parallel import compile_competitors, parallel_round_robin
+from tournament import run_tournament
+
+
+SETTINGS = dict(engine_type="montecarlo_vectorized", rounds=50, trials=300, error=0.05,
+                antithetic=False, control_variate=False, common_random_numbers=False,
+                crn_seed=0, seed=np.random.SeedSequence(3, spawn_key=(1, 2)))
+
+
+def test_tables_survive_the_wire(field):
+    tables_1, _ = compile_competitors(field())
+    for table in tables_1:
+        again = table_from_dict(table_to_dict(table))
+        np.testing.assert_array_equal(again.coop, table.coop)
+        np.testing.assert_array_equal(again.next_internal, table.next_internal)
+        assert (again.name, again.memory_size, again.initial) == (table.name, table.memory_size, table.initial)
+
+
+@pytest.mark.parametrize("engine, kwargs", [
+    ("markov", dict(error=0.05)),
+    ("montecarlo_vectorized", dict(trials=500, error=0.05, control_variate=True)),
+])
+def test_local_fallback_matches_serial(field, engine, kwargs):
+    serial = run_tournament(field(), engine, seed=7, **kwargs)
+    remote = run_tournament(field(), engine, seed=7, coordinator="local", workers=2, **kwargs)
+    np.testing.assert_array_equal(remote.to_numpy(), serial.to_numpy())
+    assert remote.attrs == serial.attrs
+
+
+def run_job(coordinator, chunks, competitors):
+    tables_1, tables_2 = compile_competitors(competitors)
+    out = {}
+    job = threading.Thread(target=lambda: out.update(
+        results=coordinator.run(tables_1, tables_2, SETTINGS, chunks)))
+    job.start()
+    return job, out
+
+
+def as_dict(results):
+    return {(i, j): (s_i, s_j, path, tuple(vr)) for i, j, s_i, s_j, path, vr in results}
+
+
+@pytest.mark.parametrize("failure", ["silent", "disconnect"])
+def test_lost_batches_are_requeued(field, failure):
+    coordinator = Coordinator(heartbeat_timeout=0.4)
+    host, port = coordinator.address
+    chunks = [[[0, 1], [2, 3]], [[4, 5], [1, 6]], [[0, 6]]]
+
+    # A worker that takes one batch and then goes quiet or hangs up
+    bad = socket.create_connection((host, port))
+    job, out = run_job(coordinator, chunks, field())
+    send_message(bad, {"type": "get"})
+    assert recv_message(bad)["type"] in ("setup", "wait")
+    send_message(bad, {"type": "get"})
+    message = recv_message(bad)
+    while message["type"] != "batch":
+        send_message(bad, {"type": "get"})
+        message = recv_message(bad)
+    if failure == "disconnect":
+        bad.close()
+
+    good = threading.Thread(target=serve_worker, args=(host, port), kwargs={"heartbeat": 0.1},
+                            daemon=True)
+    good.start()
+    job.join(timeout=30)
+    assert not job.is_alive()
+    assert coordinator.requeued >= 1
+
+    played = as_dict(out["results"])
+    reference = parallel_round_robin(field(), 1, **SETTINGS)
+    for pair in [(0, 1), (2, 3), (4, 5), (1, 6), (0, 6)]:
+        assert played[pair] == reference[pair]
+
+    coordinator.close()
+    if failure == "silent":
+        bad.close()
+
+
+def test_worker_exception_fails_the_job(field):
+    coordinator = Coordinator()
+    host, port = coordinator.address
+    tables_1, tables_2 = compile_competitors(field())
+    worker = threading.Thread(target=serve_worker, args=(host, port), daemon=True)
+    worker.start()
+    with pytest.raises(RuntimeError, match="Unknown engine_type"):
+        coordinator.run(tables_1, tables_2, dict(SETTINGS, engine_type="bogus"), [[[0, 1]]],
+                        timeout=30)
+    # The worker survived the failure and plays the next job
+    results = coordinator.run(tables_1, tables_2, SETTINGS, [[[0, 1]]], timeout=30)
+    assert as_dict(results)[(0, 1)] == parallel_round_robin(field(), 1, **SETTINGS)[(0, 1)]
+    coordinator.close()
+    worker.join(timeout=5)
+
+
+def test_run_fails_without_workers(field):
+    tables_1, tables_2 = compile_competitors(field())
+    coordinator = Coordinator(orphan_timeout=0.3)
+    with pytest.raises(RuntimeError, match="No worker connected"):
+        coordinator.run(tables_1, tables_2, SETTINGS, [[[0, 1]]])
+    coordinator.orphan_timeout = 60.0
+    with pytest.raises(TimeoutError):
+        coordinator.run(tables_1, tables_2, SETTINGS, [[[0, 1]]], timeout=0.3)
+    coordinator.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
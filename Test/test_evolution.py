@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from Game.evolution import population_fitness, evolve_replicates
+from Strategies.chromosomes import ChromosomeStrategy
+from tournament import run_tournament
+
+BITS = np.array([[0, 1, 1, 0], [1, 1, 1, 1], [0, 0, 0, 0], [1, 0, 0, 1],
+                 [0, 1, 0, 1], [1, 1, 0, 0]], dtype=np.uint8)
+
+
+def strategies(bits):
+    return [ChromosomeStrategy(list(b)) for b in bits]
+
+
+@pytest.mark.parametrize("error", [0.0, 0.05])
+def test_population_fitness_matches_tournament(error):
+    pops = np.stack([BITS, BITS[::-1]])
+    fits = population_fitness(pops, rounds=50, error=error)
+    for r in range(2):
+        df = run_tournament(strategies(pops[r]), "markov", error=error)
+        np.testing.assert_allclose(fits[r], np.nansum(df.to_numpy(), axis=1))
+
+
+@pytest.mark.parametrize("k, error", [(1, 0.0), (2, 0.0), (2, 0.05)])
+def test_truncation_without_mutation_follows_tournament_loop(k, error):
+    # genetic.one_run's truncation loop: a full round-robin every generation,
+    # so re-ranked survivors are re-seated
+    pop = strategies(BITS)
+    history = []
+    for _ in range(8):
+        fits = np.nansum(run_tournament(pop, "markov", error=error).to_numpy(), axis=1)
+        history.append(fits.mean())
+        ranked = [c for c, _ in sorted(zip(pop, fits), key=lambda x: x[1], reverse=True)]
+        pop = ranked[:len(pop) - k] + [ChromosomeStrategy(c.to_bitstring()) for c in ranked[:k]]
+
+    res = evolve_replicates(BITS, BITS[:, 0] == 0, "trunc", k, [1, 2], generations=8,
+                            error=error, mu=0.0)
+    np.testing.assert_allclose(res["mean_fitness"], np.tile(history, (2, 1)))
+    final = np.array([[int(b) for b in c.to_bitstring()] for c in pop])
+    np.testing.assert_array_equal(res["chromosomes"][0], final)
+
+
+@pytest.mark.parametrize("rule", ["trunc", "prop"])
+def test_replicates_have_own_streams_and_shapes(rule):
+    both = evolve_replicates(BITS, BITS[:, 0] == 0, rule, 2, [7, 8], generations=12, mu=0.3)
+    alone = evolve_replicates(BITS, BITS[:, 0] == 0, rule, 2, [8], generations=12, mu=0.3)
+    assert both["history"].shape == both["mean_fitness"].shape == (2, 12)
+    np.testing.assert_array_equal(both["history"][1], alone["history"][0])
+    np.testing.assert_array_equal(both["chromosomes"][1], alone["chromosomes"][0])
+    assert both["chromosomes"].dtype == np.uint8
+    np.testing.assert_array_equal(both["nice"], both["chromosomes"][..., 0] == 0)
+
+
+def test_lower_memory_individuals_keep_their_memory():
+    lifted = np.tile(BITS, 4)                            # memory-1 tables on 16 bits
+    memory = np.array([1, 1, 1, 2, 2, 2])
+    res = evolve_replicates(lifted, lifted[:, 0] == 0, "prop", 1, [3, 4, 5], memory=memory,
+                            generations=10, mu=0.5)
+    pop, own = res["chromosomes"], res["memory"]
+    periodic = (pop == np.tile(pop[..., :4], 4)).all(axis=2)
+    assert periodic[own == 1].all()
+    assert (own == 1).any() and not periodic[own == 2].all()
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+import numpy as np
+
+from Game.game import MarkovGame, MonteCarloGame
+from Strategies.fsm import compile_strategy, is_stateful
+from Strategies.m0strategies import AlwaysDefect, AlwaysCooperate, RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, GrimTrigger
+from Strategies.m2strategies import Prober, Grim2
+from Utils.gamestates import state_to_last_moves
+
+
+def test_stateless_strategies_compile_to_single_state():
+    table = compile_strategy(TitForTat(), memory=2)
+    assert not is_stateful(TitForTat())
+    assert table.n_internal == 1
+    # TFT copies the opponent's last move: lowest base-4 digit CC,CD,DC,DD
+    np.testing.assert_array_equal(table.coop[0], np.tile([1.0, 0.0, 1.0, 0.0], 4))
+
+
+def test_grim_trigger_table():
+    table = compile_strategy(GrimTrigger(), memory=1, view=state_to_last_moves)
+    assert table.initial == 0
+    np.testing.assert_array_equal(table.coop, [[1, 0, 1, 0], [0, 0, 0, 0]])
+    np.testing.assert_array_equal(table.next_internal, [[0, 1, 0, 1], [1, 1, 1, 1]])
+
+
+@pytest.mark.parametrize("make1, make2, expected", [
+    (GrimTrigger, AlwaysDefect, (49.0, 54.0)),      # exploited once, then D forever
+    (Prober, AlwaysCooperate, (246.0, 6.0)),        # D,C,C probe then exploit
+    (Grim2, TitForTat, (150.0, 150.0)),
+])
+def test_stateful_exact_noise_free(make1, make2, expected):
+    score1, score2, _ = MarkovGame(make1(), make2(), rounds=50).run()
+    assert (score1, score2) == pytest.approx(expected)
+
+
+def test_result_independent_of_prior_calls():
+    grim = GrimTrigger()
+    first = MarkovGame(grim, RandomStrategy(0.6), rounds=50, error=0.02).run()
+    grim.triggered = True            # leftover flag from an earlier match
+    second = MarkovGame(grim, RandomStrategy(0.6), rounds=50, error=0.02).run()
+    assert first[:2] == pytest.approx(second[:2])
+
+
+@pytest.mark.parametrize("method", ["doubling", "matrix_free"])
+def test_product_chain_methods_agree(method):
+    base = MarkovGame(Prober(), Grim2(), rounds=60, error=0.05).run()
+    other = MarkovGame(Prober(), Grim2(), rounds=60, error=0.05, method=method).run()
+    assert other[:2] == pytest.approx(base[:2])
+
+
+@pytest.mark.parametrize("make1, make2", [
+    (GrimTrigger, lambda: RandomStrategy(0.8)),
+    (Prober, WinStayLoseShift),
+])
+def test_product_chain_matches_monte_carlo(make1, make2):
+    random.seed(11)
+    exact = MarkovGame(make1(), make2(), rounds=50, error=0.05).run()
+    sampled = MonteCarloGame(make1(), make2(), rounds=50, error=0.05, trials=20000).run()
+    assert sampled[0] == pytest.approx(exact[0], abs=1.0)
+    assert sampled[1] == pytest.approx(exact[1], abs=1.0)
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,143 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import copy
+
+import pytest
+import numpy as np
+
+from Strategies.chromosomes import ChromosomeStrategy
+from tournament import run_tournament, PayoffLedger, GenotypePopulation
+
+
+def test_pairs_option_plays_only_those_matches(population):
+    pop = population()
+    full = run_tournament(pop, "markov", error=0.05).to_numpy()
+    part = run_tournament(pop, "markov", error=0.05, pairs=[(0, 3), (2, 6)]).to_numpy()
+    played = ~np.isnan(part)
+    assert played.sum() == 4
+    np.testing.assert_array_equal(part[played], full[played])
+
+
+def test_ledger_matches_full_tournament_and_plays_only_new_pairs(population):
+    pop = population()
+    ledger = PayoffLedger(engine_type="markov", error=0.05)
+    fits = ledger.fitness(pop)
+    full = np.nansum(run_tournament(pop, "markov", error=0.05).to_numpy(), axis=1)
+    np.testing.assert_allclose(fits, full)
+    assert ledger.played == 28
+
+    # Replace two individuals: only their 2 × 6 + 1 matches are new
+    pop = pop[:3] + [ChromosomeStrategy("1111"), ChromosomeStrategy("0101")] + pop[5:]
+    fits = ledger.fitness(pop)
+    assert ledger.played == 28 + 13
+    full = np.nansum(run_tournament(pop, "markov", error=0.05).to_numpy(), axis=1)
+    np.testing.assert_allclose(fits, full)
+    assert len(ledger.scores) == 28             # departed individuals are forgotten
+
+
+def test_ledger_seats_reordered_survivors_like_full_tournament(population):
+    pop = population()
+    ledger = PayoffLedger(engine_type="markov", error=0.05)
+    for child in ("1100", "0011", "1010"):
+        fits = ledger.fitness(pop)
+        full = np.nansum(run_tournament(pop, "markov", error=0.05).to_numpy(), axis=1)
+        np.testing.assert_allclose(fits, full)
+        # Re-rank survivors by fitness, replace the bottom one with a child
+        ranked = [c for _, c in sorted(zip(fits, pop), key=lambda x: x[0], reverse=True)]
+        pop = ranked[:-1] + [ChromosomeStrategy(child)]
+
+    # Both seatings of a pair are remembered: reversing the order twice
+    # plays the new seatings once
+    ledger.fitness(pop)
+    ledger.fitness(pop[::-1])
+    played = ledger.played
+    ledger.fitness(pop)
+    fits = ledger.fitness(pop[::-1])
+    assert ledger.played == played
+    full = np.nansum(run_tournament(pop[::-1], "markov", error=0.05).to_numpy(), axis=1)
+    np.testing.assert_allclose(fits, full)
+
+
+@pytest.mark.parametrize("error", [0.0, 0.05])
+def test_batched_exact_backend_matches_markov(population, error):
+    pop = population()
+    exact = PayoffLedger(engine_type="markov_batched", error=error)
+    reference = PayoffLedger(engine_type="markov", error=error)
+    np.testing.assert_allclose(exact.fitness(pop), reference.fitness(pop), atol=1e-9)
+    pop = pop[2:] + [ChromosomeStrategy("1010")]
+    np.testing.assert_allclose(exact.fitness(pop), reference.fitness(pop), atol=1e-9)
+    assert exact.played == reference.played == 28 + 6
+
+
+@pytest.mark.parametrize("option", [dict(workers=2), dict(coordinator="local"), dict(cache="x.sqlite")])
+def test_batched_backend_rejects_per_match_options(population, option):
+    with pytest.raises(ValueError, match=next(iter(option))):
+        run_tournament(population(), "markov_batched", **option)
+
+
+def test_survivors_keep_their_sampled_payoffs(population):
+    pop = population()
+    ledger = PayoffLedger(engine_type="montecarlo", trials=50, error=0.05)
+    ledger.fitness(pop, seed=1)
+    kept = {key: value for key, value in ledger.scores.items()}
+    child = ChromosomeStrategy("0011")
+    ledger.fitness(pop[1:] + [child], seed=2)   # new generation, new streams
+    for key, value in ledger.scores.items():
+        if (id(child), 0) not in key:
+            assert kept[key] == value
+
+
+def test_repeated_objects_keep_their_own_samples(population):
+    pop = population()
+    pop.append(pop[5])                          # the same object twice
+    ledger = PayoffLedger(engine_type="montecarlo", trials=50, error=0.05)
+    fits = ledger.fitness(pop, seed=3)
+    assert len(ledger.scores) == ledger.played == 36
+    players = pop[:-1] + [ChromosomeStrategy(pop[5].to_bitstring())]
+    full = run_tournament(players, "montecarlo", trials=50, error=0.05, seed=3)
+    np.testing.assert_allclose(fits, np.nansum(full.to_numpy(), axis=1))
+
+
+def clone(c):
+    copy = ChromosomeStrategy(c.to_bitstring())
+    copy.name = c.name
+    return copy
+
+
+@pytest.mark.parametrize("engine", ["markov", "markov_batched"])
+@pytest.mark.parametrize("error", [0.0, 0.05])
+def test_genotype_counts_match_full_round_robin(population, engine, error):
+    pop = population()
+    pop = pop + [clone(pop[6]), clone(pop[6]), clone(pop[5]), pop[1]]    # clones + a repeat
+    genotypes = GenotypePopulation(engine_type=engine, error=error)
+    genotypes.update(pop)
+    assert sorted(genotypes.counts.values()) == [1] * 5 + [2, 2, 3]
+    played = 0
+    for generation in range(3):
+        fits = genotypes.fitness(pop)
+        # run_tournament plays each repeat as its own (deep-copied) individual
+        players = [copy.deepcopy(c) if any(c is q for q in pop[:p]) else c for p, c in enumerate(pop)]
+        full = np.nansum(run_tournament(players, "markov", error=error).to_numpy(), axis=1)
+        np.testing.assert_allclose(fits, full, rtol=1e-12)
+        played += len(pop) * (len(pop) - 1) // 2
+        # Truncation-style turnover: re-rank survivors by fitness, add clones of the top two
+        ranked = [c for _, c in sorted(zip(fits, pop), key=lambda x: x[0], reverse=True)]
+        pop = ranked[:-2] + [clone(ranked[0]), clone(ranked[1])]
+    # Clones and repeats never replay a match
+    assert genotypes.played < played
+
+
+def test_genotype_population_plays_clones_once():
+    base = ChromosomeStrategy("0110")
+    pop = [base] + [clone(base) for _ in range(7)]
+    genotypes = GenotypePopulation(engine_type="markov", error=0.05)
+    fits = genotypes.fitness(pop)
+    assert genotypes.played == 1 and genotypes.counts == {genotypes.update(pop)[0]: 8}
+    full = np.nansum(run_tournament(pop, "markov", error=0.05).to_numpy(), axis=1)
+    np.testing.assert_allclose(fits, full)
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from Utils.lru_cache import LRUCache, sizeof
+from Strategies.fsm import strategy_fingerprint, compile_strategy, TableStrategy
+from Strategies.chromosomes import ChromosomeStrategy
+from Strategies.m0strategies import RandomStrategy
+from Strategies.m1strategies import TitForTat, GrimTrigger
+from Strategies.m2strategies import Prober
+from Strategies.m3strategies import Pavlov3
+from Game.game import MarkovGame
+
+
+def test_evicts_least_recently_used_by_bytes():
+    block = np.zeros(100)
+    cache = LRUCache(max_bytes=3 * sizeof(block))
+    for key in "abc":
+        cache.put(key, np.zeros(100))
+    assert cache.get("a") is not None          # "b" is now the oldest
+    cache.put("d", np.zeros(100))
+    assert "b" not in cache and all(k in cache for k in "acd")
+    assert cache.nbytes <= cache.max_bytes and cache.evictions == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    cache.put("huge", np.zeros(10_000))        # larger than the whole budget
+    assert "huge" not in cache and len(cache) == 3
+
+
+def test_sizeof_counts_slotted_attributes():
+    table = compile_strategy(Pavlov3(), 3)
+    arrays = table.coop.nbytes + table.next_internal.nbytes
+    assert sizeof(table) >= arrays
+    long = ChromosomeStrategy("1" * 64)
+    assert sizeof(long) >= sys.getsizeof(long) + sys.getsizeof(long.genome)
+
+
+def test_fingerprints_ignore_names_and_flags_but_not_parameters():
+    a, b = GrimTrigger(), GrimTrigger()
+    b.name, b.triggered = "renamed", True
+    assert strategy_fingerprint(a) == strategy_fingerprint(b)
+    assert strategy_fingerprint(RandomStrategy(0.3)) != strategy_fingerprint(RandomStrategy(0.4))
+    assert strategy_fingerprint(TitForTat()) != strategy_fingerprint(GrimTrigger())
+
+    chrom = ChromosomeStrategy("0110")
+    twin = ChromosomeStrategy([0, 1, 1, 0])
+    twin.name = "Chrom_7"
+    assert strategy_fingerprint(chrom) == strategy_fingerprint(twin)
+
+    table = compile_strategy(Prober())
+    assert strategy_fingerprint(TableStrategy(table)) == strategy_fingerprint(TableStrategy(table))
+
+
+@pytest.mark.parametrize("method", MarkovGame.METHODS)
+@pytest.mark.parametrize("make", [lambda: (TitForTat(), Pavlov3()), lambda: (Prober(), GrimTrigger())])
+def test_cached_games_match_fresh_builds(make, method):
+    cache = LRUCache()
+    first = MarkovGame(*make(), error=0.05, method=method, cache=cache).run()
+    again = MarkovGame(*make(), error=0.05, method=method, cache=cache)
+    assert cache.hits == 1                     # chain reused on construction
+    second = again.run()
+    fresh = MarkovGame(*make(), error=0.05, method=method, cache=None).run()
+
+    assert first[:2] == second[:2] == fresh[:2]
+    np.testing.assert_array_equal(second[2], fresh[2])
+    assert cache.hits == 2                     # … and the finished payoffs
+    assert not again.outcome_probs.flags.writeable
+
+    # Another horizon reuses the chain but not the payoffs; another error rate
+    # is a different chain
+    hits = cache.hits
+    short = MarkovGame(*make(), rounds=20, error=0.05, method=method, cache=cache).run()
+    assert cache.hits > hits
+    assert short[:2] == MarkovGame(*make(), rounds=20, error=0.05, method=method, cache=None).run()[:2]
+    hits = cache.hits
+    MarkovGame(*make(), error=0.01, method=method, cache=cache).run()
+    assert cache.hits == hits
+
+
+def test_seats_are_not_interchangeable():
+    cache = LRUCache()
+    s12 = MarkovGame(Prober(), Pavlov3(), error=0.05, cache=cache).run()
+    s21 = MarkovGame(Pavlov3(), Prober(), error=0.05, cache=cache).run()
+    assert cache.hits == 0
+    assert s12[:2] == pytest.approx(s21[1::-1])
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,177 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from Game.game import MarkovGame, StationaryGame
+from Utils.payoff_matrix import payoff_matrix
+from Utils.gamestates import states, state_to_last_moves, state_to_last_moves_reversed
+from Markov.markovm import build_transition_matrix, state_index
+from Strategies.chromosomes import ChromosomeStrategy
+from Strategies.m0strategies import AlwaysDefect, RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, ReverseTitForTat
+from Strategies.m2strategies import Pavlov2, SuspiciousTf2T
+from Strategies.m3strategies import Pavlov3, Generous3
+
+pairs = [
+    (TitForTat, AlwaysDefect),
+    (WinStayLoseShift, lambda: RandomStrategy(coop_prob=0.3)),
+    (Pavlov2, TitForTat),
+    (SuspiciousTf2T, Pavlov3),
+    (Generous3, WinStayLoseShift),
+]
+
+
+def reference_scores(game):
+    """Per-state accumulation exactly as the original engine did it."""
+    p_t = game.initial_distribution.copy()
+    total1 = total2 = 0.0
+    for _ in range(game.rounds):
+        p_t = p_t @ game.transition_matrix
+        for i, state in enumerate(game.states):
+            last_round = state if isinstance(state, str) else state[-1]
+            payoff1, payoff2 = payoff_matrix[last_round]
+            total1 += p_t[i] * payoff1
+            total2 += p_t[i] * payoff2
+    return total1, total2
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+@pytest.mark.parametrize("error", [0.0, 0.05])
+def test_vectorised_payoffs_match_per_state_loop(make1, make2, error):
+    game = MarkovGame(make1(), make2(), rounds=50, error=error)
+    score1, score2, p_t = game.run()
+    ref1, ref2 = reference_scores(game)
+    assert score1 == pytest.approx(ref1, abs=1e-9)
+    assert score2 == pytest.approx(ref2, abs=1e-9)
+    assert p_t.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+@pytest.mark.parametrize("rounds", [0, 1, 7, 50, 201])
+def test_doubling_matches_iteration(make1, make2, rounds):
+    it = MarkovGame(make1(), make2(), rounds=rounds, error=0.03)
+    db = MarkovGame(make1(), make2(), rounds=rounds, error=0.03, method="doubling")
+    it1, it2, it_p = it.run()
+    db1, db2, db_p = db.run()
+    assert db1 == pytest.approx(it1, rel=1e-10, abs=1e-9)
+    assert db2 == pytest.approx(it2, rel=1e-10, abs=1e-9)
+    np.testing.assert_allclose(db_p, it_p, atol=1e-12)
+
+
+def test_doubling_handles_very_long_games():
+    game = MarkovGame(TitForTat(), AlwaysDefect(), rounds=10**6, method="doubling")
+    score1, score2, _ = game.run()
+    # TFT is exploited once, then mutual defection forever
+    assert score1 == pytest.approx(10**6 - 1)
+    assert score2 == pytest.approx(10**6 + 4)
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        MarkovGame(TitForTat(), AlwaysDefect(), method="bogus")
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+def test_stationary_matches_long_horizon_average(make1, make2):
+    rounds = 10**7
+    avg1, avg2, pi = StationaryGame(make1(), make2(), error=0.02).run()
+    long1, long2, _ = MarkovGame(make1(), make2(), rounds=rounds, error=0.02,
+                                 method="doubling").run()
+    assert pi.sum() == pytest.approx(1.0)
+    assert avg1 == pytest.approx(long1 / rounds, abs=1e-4)
+    assert avg2 == pytest.approx(long2 / rounds, abs=1e-4)
+
+
+def test_stationary_reducible_chain_depends_on_initial_state():
+    # Noise-free TFT mirror: CC and DD are absorbing, CD/DC alternate forever
+    for start, expected in [("CC", 3.0), ("DD", 1.0), ("CD", 2.5)]:
+        game = StationaryGame(TitForTat(), TitForTat(), initial_state=start)
+        avg1, avg2, _ = game.run()
+        assert avg1 == pytest.approx(expected)
+        assert avg2 == pytest.approx(expected)
+    assert game.info["periodic"]
+    assert sorted(game.info["periods"]) == [1, 1, 2]
+
+
+def test_stationary_periodic_chain_uses_time_average():
+    # WSLS vs Reverse-TFT cycles through all four outcomes with period 4
+    game = StationaryGame(WinStayLoseShift(), ReverseTitForTat())
+    avg1, avg2, pi = game.run()
+    assert game.info["periods"] == [4]
+    np.testing.assert_allclose(pi, 0.25)
+    assert avg1 == pytest.approx(2.25)
+
+
+def reference_matrix(strat1, strat2, error, m):
+    """Tuple-and-dict builder in the style of the original Markov.markov3."""
+    from itertools import product
+    hist = list(product(states, repeat=m))
+    index = {h: i for i, h in enumerate(hist)}
+    matrix = np.zeros((len(hist), len(hist)))
+    for i, h in enumerate(hist):
+        p1 = strat1.move_probabilities(h, state_to_last_moves)["C"]
+        p2 = strat2.move_probabilities(h, state_to_last_moves_reversed)["C"]
+        p1 = (1 - error) * p1 + error * (1 - p1)
+        p2 = (1 - error) * p2 + error * (1 - p2)
+        for a, pa in (("C", p1), ("D", 1 - p1)):
+            for b, pb in (("C", p2), ("D", 1 - p2)):
+                matrix[i, index[(*h[1:], a + b)]] += pa * pb
+    return matrix
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+@pytest.mark.parametrize("m", [3, 4])
+def test_generic_builder_matches_tuple_builder(make1, make2, m):
+    s1, s2 = make1(), make2()
+    matrix, hist = build_transition_matrix(s1, s2, 0.07, memory=m)
+    np.testing.assert_allclose(matrix, reference_matrix(s1, s2, 0.07, m), atol=1e-15)
+    assert len(hist) == 4 ** m
+    assert all(state_index(h, m) == i for i, h in enumerate(hist))
+
+
+def test_lifting_preserves_payoffs():
+    for m in (2, 3, 5):
+        chrom = ChromosomeStrategy("0101" * 4 ** (m - 1))   # TFT written at memory m
+        lifted = MarkovGame(chrom, WinStayLoseShift(), rounds=60, error=0.04).run()
+        base = MarkovGame(TitForTat(), WinStayLoseShift(), rounds=60, error=0.04).run()
+        assert lifted[0] == pytest.approx(base[0])
+        assert lifted[1] == pytest.approx(base[1])
+
+
+def test_memory_above_three_supported():
+    rng = np.random.default_rng(7)
+    s1 = ChromosomeStrategy(list(rng.integers(0, 2, 4 ** 5)))
+    s2 = ChromosomeStrategy(list(rng.integers(0, 2, 4 ** 4)))
+    game = MarkovGame(s1, s2, rounds=30, error=0.01)
+    score1, score2, p_t = game.run()
+    assert game.transition_matrix.shape == (4 ** 5, 4 ** 5)
+    assert 0 <= score1 <= 150 and 0 <= score2 <= 150
+    assert p_t.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+def test_matrix_free_matches_dense(make1, make2):
+    dense = MarkovGame(make1(), make2(), rounds=40, error=0.05).run()
+    game = MarkovGame(make1(), make2(), rounds=40, error=0.05, method="matrix_free")
+    free = game.run()
+    assert free[0] == pytest.approx(dense[0], abs=1e-9)
+    assert free[1] == pytest.approx(dense[1], abs=1e-9)
+    np.testing.assert_allclose(free[2], dense[2], atol=1e-12)
+    assert game._transition_matrix is None      # never materialised
+
+
+def test_matrix_free_memory_six():
+    rng = np.random.default_rng(3)
+    s1 = ChromosomeStrategy(list(rng.integers(0, 2, 4 ** 6)))
+    game = MarkovGame(s1, Pavlov3(), rounds=25, error=0.02, method="matrix_free")
+    score1, score2, p_t = game.run()
+    assert p_t.shape == (4 ** 6,)
+    assert p_t.sum() == pytest.approx(1.0)
+    assert game._transition_matrix is None
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
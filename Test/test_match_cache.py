@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import multiprocessing
+import pytest
+import numpy as np
+
+from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+from Utils.match_cache import MatchCache, match_key
+from Strategies.fsm import compile_strategy
+from Strategies.chromosomes import ChromosomeStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift
+from Strategies.m2strategies import Pavlov2, Prober, TitForTwoTats
+from tournament import run_tournament
+
+
+def tables(s1, s2):
+    return (compile_strategy(s1, None, state_to_last_moves),
+            compile_strategy(s2, None, state_to_last_moves_reversed))
+
+
+def test_keys_are_content_addressed():
+    base = match_key(*tables(TitForTat(), Prober()), engine="markov", rounds=50, error=0.05)
+    renamed = ChromosomeStrategy("0101")              # TFT's table under another name
+    assert match_key(*tables(renamed, Prober()), engine="markov", rounds=50, error=0.05) == base
+    assert match_key(*tables(TitForTat(), Prober()), engine="markov", rounds=50, error=0.06) != base
+    assert match_key(*tables(Prober(), TitForTat()), engine="markov", rounds=50, error=0.05) != base
+    seeded = [match_key(*tables(TitForTat(), Prober()), engine="montecarlo", seed=np.random.SeedSequence(1, spawn_key=(k,)))
+              for k in (0, 0, 1)]
+    assert seeded[0] == seeded[1] != seeded[2]
+
+
+def test_round_trip_is_exact(tmp_path):
+    cache = MatchCache(str(tmp_path / "m.sqlite"))
+    value = ((0.1 + 0.2, 1 / 3), "sampled", (np.inf, 2.5))
+    cache.put("k", value)
+    cache.put("m", ((150.0, 150.0), "markov", None))
+    assert cache.get("k") == value
+    assert cache.get("m") == ((150.0, 150.0), "markov", None)
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = MatchCache(str(tmp_path / "m.sqlite"), max_entries=3)
+    for key in "abc":
+        cache.put(key, ((1.0,), None, None))
+    cache.get("a")                                    # a is now fresher than b
+    cache.put("d", ((1.0,), None, None))
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def _writer(args):
+    path, worker = args
+    cache = MatchCache(path)
+    for n in range(40):
+        cache.put(f"{worker}-{n}", ((float(n),), None, None))
+        cache.get(f"{worker}-{n // 2}")
+    return worker
+
+
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / "m.sqlite")
+    MatchCache(path)
+    with multiprocessing.Pool(4) as pool:
+        pool.map(_writer, [(path, w) for w in range(4)])
+    cache = MatchCache(path)
+    assert len(cache) == 160
+    assert cache.get("3-39") == ((39.0,), None, None)
+
+
+@pytest.mark.parametrize("engine, kwargs", [
+    ("markov", dict(error=0.05)),
+    ("montecarlo_vectorized", dict(trials=300, error=0.05, seed=2)),
+])
+def test_tournament_reruns_only_pay_for_new_pairs(tmp_path, field, engine, kwargs):
+    cache = MatchCache(str(tmp_path / "m.sqlite"))
+    fresh = run_tournament(field(), engine, cache=cache, **kwargs)
+    assert (cache.hits, cache.misses) == (0, 36)
+
+    again = run_tournament(field(), engine, cache=cache, **kwargs)
+    np.testing.assert_array_equal(again.to_numpy(), fresh.to_numpy())
+    assert again.attrs == fresh.attrs
+    assert (cache.hits, cache.misses) == (36, 36)
+
+    # One newcomer: only its nine pairs are new
+    run_tournament(field() + [TitForTwoTats()], engine, cache=cache, **kwargs)
+    assert (cache.hits, cache.misses) == (72, 45)
+
+
+def test_identical_tables_are_played_once(tmp_path):
+    cache = MatchCache(str(tmp_path / "m.sqlite"))
+    # This WinStayLoseShift compiles to TitForTat's tables in both seats
+    twins = [Pavlov2(), TitForTat(), WinStayLoseShift()]
+    df = run_tournament(twins, "markov", error=0.05, cache=cache)
+    assert len(cache) == 2
+    assert df.iloc[0, 1] == df.iloc[0, 2]
+    assert df.iloc[1, 0] == df.iloc[2, 0]
+
+
+def test_unseeded_monte_carlo_is_not_cached(tmp_path, field):
+    cache = MatchCache(str(tmp_path / "m.sqlite"))
+    run_tournament(field(), "montecarlo_vectorized", trials=100, error=0.05, cache=cache)
+    assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
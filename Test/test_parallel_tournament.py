@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+import numpy as np
+
+from Utils.gamestates import state_to_last_moves, state_to_last_moves_reversed
+from Strategies.fsm import compile_strategy, TableStrategy
+from Game.game import MarkovGame
+from Game.parallel import cost_chunks, match_cost, compile_competitors, map_replicates
+from Utils.random_seed import seed_sequence
+from Strategies.chromosomes import ChromosomeStrategy
+from Strategies.m0strategies import RandomStrategy
+from Strategies.m1strategies import GrimTrigger
+from Strategies.m2strategies import Prober
+from Strategies.m3strategies import Pavlov3, Generous3
+from tournament import run_tournament, GenotypePopulation
+
+
+@pytest.mark.parametrize("make", [Prober, GrimTrigger, Generous3, lambda: RandomStrategy(0.3)])
+@pytest.mark.parametrize("view", [state_to_last_moves, state_to_last_moves_reversed])
+def test_table_strategy_round_trips(make, view):
+    table = compile_strategy(make(), None, view)
+    again = compile_strategy(TableStrategy(table), None, view)
+    np.testing.assert_array_equal(again.coop, table.coop)
+    np.testing.assert_array_equal(again.next_internal, table.next_internal)
+    assert again.initial == table.initial
+
+
+def test_table_strategies_score_like_originals():
+    t1 = compile_strategy(Prober(), None, state_to_last_moves)
+    t2 = compile_strategy(Pavlov3(), None, state_to_last_moves_reversed)
+    exact = MarkovGame(Prober(), Pavlov3(), error=0.05).run()
+    tables = MarkovGame(TableStrategy(t1), TableStrategy(t2), error=0.05).run()
+    assert tables[:2] == exact[:2]
+
+
+def test_cost_chunks_balance_and_cover(field):
+    tables_1, tables_2 = compile_competitors(field())
+    pairs = [(i, j) for i in range(9) for j in range(i + 1, 9)]
+    costs = [match_cost(tables_1[i], tables_2[j]) for i, j in pairs]
+    chunks = cost_chunks(pairs, costs, 4)
+    assert sorted(p for chunk in chunks for p in chunk) == pairs
+    loads = [sum(costs[pairs.index(p)] for p in chunk) for chunk in chunks]
+    assert max(loads) - min(loads) <= max(costs)
+    # Memory-3 pairs weigh more than memory-1 pairs
+    assert match_cost(tables_1[7], tables_2[8]) > match_cost(tables_1[2], tables_2[3])
+
+
+@pytest.mark.parametrize("engine, kwargs", [
+    ("markov", dict(error=0.05)),
+    ("montecarlo", dict(trials=50, error=0.05)),
+    ("montecarlo_vectorized", dict(trials=500, error=0.05, antithetic=True)),
+])
+def test_parallel_matches_serial_for_any_worker_count(field, engine, kwargs):
+    serial = run_tournament(field(), engine, seed=5, **kwargs)
+    for workers in (1, 3):
+        pooled = run_tournament(field(), engine, seed=5, workers=workers, **kwargs)
+        np.testing.assert_array_equal(pooled.to_numpy(), serial.to_numpy())
+        assert pooled.attrs["match_paths"] == serial.attrs["match_paths"]
+
+
+def ga_replicate(k, rep_id):
+    # A few sampled truncation generations, seeded like genetic.one_run
+    random.seed(rep_id)
+    pop = [ChromosomeStrategy(bits) for bits in ("0110", "1111", "0000", "1001", "0101", "1100")]
+    genotypes = GenotypePopulation(engine_type="montecarlo", trials=30, error=0.05)
+    means = []
+    for g in range(4):
+        fits = genotypes.fitness(pop, seed=seed_sequence("genetic", rep_id, g, seed=42))
+        means.append(fits.mean())
+        ranked = [c for c, _ in sorted(zip(pop, fits), key=lambda x: x[1], reverse=True)]
+        pop = ranked[:len(pop) - k] + [c.mutated(0.25) for c in ranked[:k]]
+    return means, [c.genome for c in pop]
+
+
+def test_pooled_replicates_match_serial_loop():
+    jobs = [(k, rep_id) for k in (1, 2) for rep_id in (3, 4, 5)]
+    serial = [ga_replicate(*job) for job in jobs]
+    assert map_replicates(ga_replicate, jobs, workers=3) == serial
+    assert map_replicates(ga_replicate, jobs, workers=1) == serial
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+import numpy as np
+
+from Utils.random_seed import set_seed, seed_sequence, stream, as_generator
+from Strategies.fsm import compile_strategy, TableStrategy
+from Game.game import MarkovGame, MonteCarloGame
+from Game.montecarlo import VectorizedMonteCarloGame
+from Strategies.m0strategies import RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, GrimTrigger
+from Strategies.m2strategies import Prober, Pavlov2
+from tournament import run_tournament
+
+
+def test_set_seed_fixes_global_and_derived_streams():
+    set_seed(7)
+    a = (random.random(), np.random.random(), stream("x", 1).random())
+    set_seed(7)
+    b = (random.random(), np.random.random(), stream("x", 1).random())
+    assert a == b
+
+
+def test_streams_are_keyed_by_work_not_by_order():
+    first = [stream("exp", r, seed=1).random(3) for r in range(4)]
+    backwards = [stream("exp", r, seed=1).random(3) for r in reversed(range(4))][::-1]
+    np.testing.assert_array_equal(first, backwards)
+    assert not np.allclose(first[0], first[1])
+    assert not np.allclose(stream("exp", 0, seed=1).random(3), stream("exp", 0, seed=2).random(3))
+
+
+def test_seed_sequences_nest():
+    parent = seed_sequence("genetic", 3, seed=42)
+    child = seed_sequence(5, seed=parent)
+    np.testing.assert_array_equal(np.random.default_rng(child).random(4),
+                                  stream("genetic", 3, 5, seed=42).random(4))
+
+
+def test_as_generator():
+    rng = np.random.default_rng(0)
+    assert as_generator(rng) is rng
+    assert as_generator(5).random() == np.random.default_rng(5).random()
+    set_seed(3)
+    a = as_generator().random()
+    set_seed(3)
+    assert as_generator().random() == a
+
+
+def test_stochastic_strategies_draw_from_given_generator():
+    table = TableStrategy(compile_strategy(RandomStrategy(0.5)))
+    for strat in (RandomStrategy(0.5), table):
+        runs = []
+        for _ in range(2):
+            rng = np.random.default_rng(4)
+            runs.append([strat.next_move(("CC",), None, rng=rng) for _ in range(40)])
+        assert runs[0] == runs[1] and set(runs[0]) == {"C", "D"}
+
+
+@pytest.mark.parametrize("make1, make2", [(Prober, lambda: RandomStrategy(0.6)),
+                                          (GrimTrigger, WinStayLoseShift)])
+def test_scalar_monte_carlo_with_generator(make1, make2):
+    runs = [MonteCarloGame(make1(), make2(), error=0.05, trials=4000, rng=11).run()
+            for _ in range(2)]
+    assert runs[0] == runs[1]
+    set_seed(5)
+    unseeded = MonteCarloGame(make1(), make2(), error=0.05, trials=200).run()
+    set_seed(5)
+    assert MonteCarloGame(make1(), make2(), error=0.05, trials=200).run() == unseeded
+    exact1, exact2, _ = MarkovGame(make1(), make2(), error=0.05).run()
+    assert runs[0][0] == pytest.approx(exact1, abs=1.5)
+    assert runs[0][1] == pytest.approx(exact2, abs=1.5)
+
+
+def test_vectorized_accepts_seed():
+    a = VectorizedMonteCarloGame(TitForTat(), RandomStrategy(), error=0.05, trials=500, rng=3).run()
+    b = VectorizedMonteCarloGame(TitForTat(), RandomStrategy(), error=0.05, trials=500,
+                                 rng=np.random.default_rng(3)).run()
+    assert a == b
+
+
+@pytest.mark.parametrize("engine", ["montecarlo", "montecarlo_vectorized"])
+def test_tournament_seed_gives_per_match_streams(engine):
+    field = [TitForTat(), RandomStrategy(0.5), Prober(), Pavlov2()]
+    df1 = run_tournament(field, engine, trials=300, error=0.05, seed=9)
+    df2 = run_tournament(field, engine, trials=300, error=0.05, seed=9)
+    np.testing.assert_array_equal(df1.to_numpy(), df2.to_numpy())
+
+    # Each match can be replayed on its own from its (i, j) stream
+    game = MonteCarloGame(field[1], field[2], trials=300, error=0.05,
+                          rng=stream("match", 1, 2, seed=9))
+    if engine == "montecarlo_vectorized":
+        game = VectorizedMonteCarloGame(field[1], field[2], trials=300, error=0.05,
+                                        rng=stream("match", 1, 2, seed=9))
+    score_1, score_2 = game.run()
+    assert df1.iloc[1, 2] == score_1
+    assert df1.iloc[2, 1] == score_2
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
@@ -0,0 +1,241 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from Game.game import MarkovGame, MonteCarloGame
+from Strategies.chromosomes import ChromosomeStrategy
+from Game.montecarlo import VectorizedMonteCarloGame, CoupledNoiseSweep
+from Utils.running_stats import RunningStats
+from Strategies.m0strategies import AlwaysDefect, RandomStrategy
+from Strategies.m1strategies import TitForTat, WinStayLoseShift, GrimTrigger
+from Strategies.m2strategies import Pavlov2, SuspiciousTf2T, Prober
+from Strategies.m3strategies import Pavlov3, Generous3
+
+pairs = [
+    (TitForTat, lambda: RandomStrategy(coop_prob=0.5)),
+    (WinStayLoseShift, Pavlov2),
+    (SuspiciousTf2T, Pavlov3),
+    (Prober, GrimTrigger),
+    (Generous3, AlwaysDefect),
+]
+
+
+@pytest.mark.parametrize("make1, make2", pairs)
+def test_vectorized_matches_markov_expectation(make1, make2):
+    error = 0.05
+    game = VectorizedMonteCarloGame(make1(), make2(), rounds=50, error=error,
+                                    trials=20000, rng=np.random.default_rng(2024))
+    score1, score2 = game.simulate(game.trials)
+    exact1, exact2, _ = MarkovGame(make1(), make2(), rounds=50, error=error).run()
+
+    se1 = score1.std(ddof=1) / np.sqrt(len(score1))
+    se2 = score2.std(ddof=1) / np.sqrt(len(score2))
+    assert abs(score1.mean() - exact1) < 4 * se1 + 1e-9
+    assert abs(score2.mean() - exact2) < 4 * se2 + 1e-9
+
+
+def test_noise_free_deterministic_match_is_exact():
+    game = VectorizedMonteCarloGame(Pavlov3(), Generous3(), rounds=50, trials=100)
+    assert game.run() == (150.0, 150.0)
+
+
+def test_same_seed_same_result():
+    run = lambda seed: VectorizedMonteCarloGame(
+        TitForTat(), RandomStrategy(0.4), error=0.1, trials=500,
+        rng=np.random.default_rng(seed)).run()
+    assert run(5) == run(5)
+    assert run(5) != run(6)
+
+
+@pytest.mark.parametrize("engine", [MonteCarloGame, VectorizedMonteCarloGame])
+def test_deterministic_short_circuit(engine):
+    s1 = ChromosomeStrategy("0110100110010110")
+    s2 = Prober()
+    game = engine(s1, s2, rounds=50, error=0.0, trials=1000)
+    score = game.run()
+    exact = MarkovGame(s1, s2, rounds=50).run()
+    assert game.path == "deterministic"
+    assert score == pytest.approx(exact[:2], abs=1e-12)
+
+
+@pytest.mark.parametrize("engine", [MonteCarloGame, VectorizedMonteCarloGame])
+@pytest.mark.parametrize("make1, make2, error", [
+    (TitForTat, lambda: RandomStrategy(0.5), 0.0),     # stochastic strategy
+    (TitForTat, Pavlov2, 0.01),                        # noise
+])
+def test_sampled_path_when_not_deterministic(engine, make1, make2, error):
+    game = engine(make1(), make2(), rounds=10, error=error, trials=50)
+    game.run()
+    assert game.path == "sampled"
+
+
+def test_running_stats_matches_numpy():
+    values = np.random.default_rng(0).normal(3.0, 2.0, size=1037)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 9):
+        stats.update(chunk)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var(ddof=1))
+    assert stats.se == pytest.approx(values.std(ddof=1) / np.sqrt(len(values)))
+
+
+def test_adaptive_run_meets_target():
+    game = VectorizedMonteCarloGame(TitForTat(), RandomStrategy(0.5), error=0.05,
+                                    rng=np.random.default_rng(9))
+    mean1, mean2, se1, se2, n = game.run_adaptive(target_se=0.15)
+    exact1, exact2, _ = MarkovGame(TitForTat(), RandomStrategy(0.5), error=0.05).run()
+    assert max(se1, se2) <= 0.15
+    assert n < 10_000
+    assert abs(mean1 - exact1) < 4 * se1
+    assert abs(mean2 - exact2) < 4 * se2
+
+
+def test_adaptive_run_halfwidth_and_cap():
+    game = VectorizedMonteCarloGame(Generous3(), WinStayLoseShift(), error=0.05,
+                                    rng=np.random.default_rng(1))
+    *_, se1, se2, n = game.run_adaptive(target_halfwidth=0.01, max_trials=3000)
+    assert n == 3000
+    assert max(se1, se2) > 0.01 / 1.96
+
+    with pytest.raises(ValueError):
+        game.run_adaptive()
+
+
+def test_adaptive_run_deterministic_match():
+    game = VectorizedMonteCarloGame(Pavlov3(), Generous3())
+    assert game.run_adaptive(target_se=0.01) == (150.0, 150.0, 0.0, 0.0, 1)
+
+
+def test_adaptive_run_antithetic_uses_pair_variance():
+    def make():
+        return VectorizedMonteCarloGame(GrimTrigger(), RandomStrategy(0.8), error=0.05,
+                                        trials=2000, rng=np.random.default_rng(3),
+                                        antithetic=True)
+    # One batch of 2000 trials: the same pairs run() scores in one go
+    mean1, mean2, se1, se2, n = make().run_adaptive(target_se=1e-6, batch_size=2000,
+                                                    min_trials=2000, max_trials=2000)
+    game = make()
+    score1, score2 = game.run()
+    assert n == 2000
+    assert (mean1, mean2) == pytest.approx((score1, score2))
+    assert (se1, se2) == pytest.approx(game.se)
+
+
+def test_adaptive_run_rejects_control_variate():
+    game = VectorizedMonteCarloGame(GrimTrigger(), RandomStrategy(0.8), error=0.05,
+                                    control_variate=True)
+    with pytest.raises(ValueError):
+        game.run_adaptive(target_se=0.1)
+
+
+@pytest.mark.parametrize("antithetic, control_variate", [(True, False), (False, True), (True, True)])
+@pytest.mark.parametrize("make1, make2", [(Prober, WinStayLoseShift),
+                                          (GrimTrigger, lambda: RandomStrategy(0.8))])
+def test_variance_reduced_estimates_are_unbiased(make1, make2, antithetic, control_variate):
+    game = VectorizedMonteCarloGame(make1(), make2(), error=0.05, trials=20000,
+                                    rng=np.random.default_rng(11),
+                                    antithetic=antithetic, control_variate=control_variate)
+    score1, score2 = game.run()
+    exact1, exact2, _ = MarkovGame(make1(), make2(), error=0.05).run()
+    assert abs(score1 - exact1) < 4 * game.se[0]
+    assert abs(score2 - exact2) < 4 * game.se[1]
+
+
+def test_reported_variance_reduction():
+    game = VectorizedMonteCarloGame(GrimTrigger(), RandomStrategy(0.8), error=0.05,
+                                    trials=20000, rng=np.random.default_rng(5),
+                                    antithetic=True, control_variate=True)
+    game.run()
+    assert game.variance_reduction[0] > 1.5
+
+    plain = VectorizedMonteCarloGame(GrimTrigger(), RandomStrategy(0.8), error=0.05,
+                                     rng=np.random.default_rng(5))
+    plain.run()
+    assert plain.variance_reduction == pytest.approx((1.0, 1.0))
+
+
+def test_control_variate_exact_for_memoryless_pairs():
+    # A stateless pair *is* its own memoryless approximation
+    game = VectorizedMonteCarloGame(TitForTat(), RandomStrategy(0.5), error=0.05,
+                                    trials=500, control_variate=True)
+    score1, score2 = game.run()
+    exact1, exact2, _ = MarkovGame(TitForTat(), RandomStrategy(0.5), error=0.05).run()
+    assert score1 == pytest.approx(exact1)
+    assert score2 == pytest.approx(exact2)
+    assert game.se == (0.0, 0.0)
+    assert game.variance_reduction == (np.inf, np.inf)
+
+
+def test_common_random_numbers_share_draws():
+    def play(make2):
+        game = VectorizedMonteCarloGame(TitForTat(), make2(), error=0.05, trials=4000,
+                                        rng=np.random.default_rng(0))
+        return game.simulate(game.trials)[0]
+
+    # Same seed → identical draws; opponents differing in one table entry give
+    # strongly correlated per-trial scores
+    np.testing.assert_array_equal(play(Pavlov2), play(Pavlov2))
+    wsls, tft = play(WinStayLoseShift), play(TitForTat)
+    assert np.corrcoef(wsls, tft)[0, 1] > 0.5
+
+    independent = VectorizedMonteCarloGame(TitForTat(), TitForTat(), error=0.05,
+                                           trials=4000, rng=np.random.default_rng(1))
+    diff_crn = (wsls - tft).var()
+    diff_ind = (wsls - independent.simulate(4000)[0]).var()
+    assert diff_crn < diff_ind
+
+
+@pytest.mark.parametrize("make1, make2", [(TitForTat, lambda: RandomStrategy(0.3)),
+                                          (Prober, GrimTrigger)])
+def test_coupled_sweep_matches_markov_at_every_error(make1, make2):
+    errors = [0.0, 0.05, 0.1]
+    sweep = CoupledNoiseSweep(make1(), make2(), errors, trials=20000,
+                              rng=np.random.default_rng(4))
+    score1, score2 = sweep.run()
+    for e, error in enumerate(errors):
+        exact1, exact2, _ = MarkovGame(make1(), make2(), error=error).run()
+        assert abs(score1[e] - exact1) < 4 * sweep.se[0][e] + 1e-9
+        assert abs(score2[e] - exact2) < 4 * sweep.se[1][e] + 1e-9
+
+
+def test_coupled_sweep_lowers_slope_variance():
+    errors = [0.05, 0.06]
+    coupled, _ = CoupledNoiseSweep(Generous3(), Pavlov2(), errors,
+                                   rng=np.random.default_rng(0)).simulate(10000)
+    independent = [VectorizedMonteCarloGame(Generous3(), Pavlov2(), error=error,
+                                            rng=np.random.default_rng(seed)).simulate(10000)[0]
+                   for seed, error in enumerate(errors)]
+    assert np.var(coupled[1] - coupled[0]) < 0.5 * np.var(independent[1] - independent[0])
+
+
+@pytest.mark.parametrize("make1, make2", [(Prober, GrimTrigger), (TitForTat, WinStayLoseShift),
+                                          (TitForTat, lambda: RandomStrategy(0.5))])
+def test_importance_sampling_is_unbiased(make1, make2):
+    game = VectorizedMonteCarloGame(make1(), make2(), rounds=30, error=0.005, trials=20000,
+                                    rng=np.random.default_rng(8), importance_error=0.03)
+    score1, score2 = game.run()
+    exact1, exact2, _ = MarkovGame(make1(), make2(), rounds=30, error=0.005).run()
+    assert abs(score1 - exact1) < 4 * game.se[0]
+    assert abs(score2 - exact2) < 4 * game.se[1]
+    assert 0 < game.ess < 20000
+
+
+def test_importance_sampling_reduces_variance_at_small_error():
+    game = VectorizedMonteCarloGame(TitForTat(), WinStayLoseShift(), rounds=30, error=0.0002,
+                                    trials=5000, rng=np.random.default_rng(3),
+                                    importance_error=1 / 60)
+    game.run()
+    assert min(game.variance_reduction) > 10
+
+
+def test_importance_sampling_needs_noise():
+    with pytest.raises(ValueError):
+        VectorizedMonteCarloGame(TitForTat(), WinStayLoseShift(), error=0.0, importance_error=0.05)
+
+
+if __name__ == "__main__":
+    pytest.main(["-q", __file__])
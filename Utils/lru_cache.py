@@ -0,0 +1,97 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: lru_cache.py
+# Purpose: In-memory least-recently-used cache bounded by the memory of its
+#          values (NumPy arrays, tuples, tables), with hit / miss counters.
+# ──────────────────────────────────────────────────────────
+
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def _attributes(value):
+    """Instance attribute values: the `__dict__` plus every filled `__slots__` entry."""
+    fields = list(getattr(value, "__dict__", {}).values())
+    for cls in type(value).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot not in ("__dict__", "__weakref__") and hasattr(value, slot):
+                fields.append(getattr(value, slot))
+    return fields
+
+
+def sizeof(value):
+    """Approximate bytes held by `value`: array buffers plus container overhead."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    return sys.getsizeof(value) + sum(sizeof(v) for v in _attributes(value))
+
+
+class LRUCache:
+    """
+    Map that evicts its least recently used entries once the values it holds
+    exceed `max_bytes`; a value larger than the whole budget is not stored.
+    Safe to share between threads.  Callers must not mutate cached values.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()        # key → (value, size), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, dropped) = self._data.popitem(last=False)
+                self.nbytes -= dropped
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._data), "bytes": self.nbytes,
+                    "evictions": self.evictions}
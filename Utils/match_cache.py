@@ -0,0 +1,150 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: match_cache.py
+# Purpose: Persistent, content-addressed cache of match results (SQLite),
+#          shared safely by concurrent processes, size-bounded (LRU).
+# ──────────────────────────────────────────────────────────
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+
+DEFAULT_PATH = os.path.join(".cache", "matches.sqlite")
+KEY_VERSION = b"match-v1"
+
+#   Key  = SHA-256 of both players' FiniteStateTables (cooperation
+#          probabilities, internal transitions, initial state, memory – never
+#          the strategy's name) and the canonical JSON of the match parameters
+#          (engine, rounds, error, trials, seed, …).
+#   Value = scores (float64 blob), evaluation path, optional extra floats
+#          (e.g. variance-reduction ratios); floats are stored bit-exactly.
+
+
+def _table_bytes(table):
+    header = np.array([table.memory_size, table.initial, *table.coop.shape], dtype="<i8")
+    return (header.tobytes() + np.ascontiguousarray(table.coop, dtype="<f8").tobytes()
+            + np.ascontiguousarray(table.next_internal, dtype="<i8").tobytes())
+
+
+def seed_descriptor(seed):
+    """JSON-able identity of a seed (int, SeedSequence, or any JSON value)."""
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    return seed
+
+
+def match_key(table_1, table_2, **params):
+    """Content hash of one match: both seats' tables plus its parameters."""
+    params = {k: seed_descriptor(v) for k, v in params.items()}
+    digest = hashlib.sha256(KEY_VERSION)
+    digest.update(_table_bytes(table_1))
+    digest.update(_table_bytes(table_2))
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _floats(blob):
+    return None if blob is None else tuple(np.frombuffer(blob, dtype="<f8").tolist())
+
+
+def _blob(values):
+    return None if values is None else np.asarray(values, dtype="<f8").tobytes()
+
+
+class MatchCache:
+    """
+    SQLite match store.  WAL journaling and a busy timeout let several
+    processes (parallel scripts, GA replicates) read and write at once; when
+    more than `max_entries` results are stored, the least recently used are
+    evicted.  Values are (scores, path, extra) tuples.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=1_000_000, timeout=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                " key TEXT PRIMARY KEY, scores BLOB NOT NULL, path TEXT,"
+                " extra BLOB, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS matches_lru ON matches (last_used)")
+
+    def _connect(self):
+        # One short-lived connection per operation: safe across fork / processes
+        return _Connection(sqlite3.connect(self.path, timeout=self.timeout))
+
+    def get_many(self, keys):
+        """{key: (scores, path, extra)} for the keys that are stored."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as db:
+            for lo in range(0, len(keys), 500):
+                part = keys[lo:lo + 500]
+                rows = db.execute(
+                    f"SELECT key, scores, path, extra FROM matches WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, scores, path, extra in rows:
+                    found[key] = (_floats(scores), path, _floats(extra))
+            if found:
+                now = time.time()
+                db.executemany("UPDATE matches SET last_used = ? WHERE key = ?",
+                               [(now, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store {key: (scores, path, extra)}; evicts LRU entries beyond max_entries."""
+        now = time.time()
+        rows = [(key, _blob(scores), path, _blob(extra), now)
+                for key, (scores, path, extra) in items.items()]
+        if not rows:
+            return
+        with self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?)", rows)
+            excess = db.execute("SELECT COUNT(*) FROM matches").fetchone()[0] - self.max_entries
+            if excess > 0:
+                db.execute("DELETE FROM matches WHERE key IN "
+                           "(SELECT key FROM matches ORDER BY last_used LIMIT ?)", (excess,))
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM matches")
+
+
+class _Connection:
+    """Connection context that commits (or rolls back) and always closes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.conn.close()
@@ -0,0 +1,66 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: random_seed.py
+# Purpose: Reproducible RNG streams – one global seed, and independent NumPy
+#          generators keyed by the piece of work they serve.
+# ──────────────────────────────────────────────────────────
+
+import random
+import zlib
+import numpy as np
+
+DEFAULT_SEED = 42
+_root_seed = DEFAULT_SEED
+
+#   Every stream is SeedSequence(root, spawn_key=keys): the keys name the piece
+#   of work (e.g. ("genetic", rep_id, generation, "match", i, j)), never the
+#   process that happens to run it, so results are bit-identical however the
+#   work is split across workers.  Strings in keys are hashed to stable ints.
+
+
+def set_seed(seed=DEFAULT_SEED):
+    """
+    Seed the global `random` / `np.random` state (legacy code paths) and make
+    `seed` the root of every stream below.  Returns the root SeedSequence.
+    """
+    global _root_seed
+    _root_seed = seed
+    random.seed(seed)
+    np.random.seed(seed)
+    return np.random.SeedSequence(seed)
+
+
+def _key(part):
+    if isinstance(part, str):
+        return zlib.crc32(part.encode())
+    return int(part)
+
+
+def seed_sequence(*keys, seed=None):
+    """
+    SeedSequence for the piece of work named by `keys`.  `seed` is the root: an
+    int (default: the set_seed() value) or a SeedSequence, whose own spawn key
+    is extended, so streams can be derived level by level.
+    """
+    keys = tuple(_key(k) for k in keys)
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + keys)
+    return np.random.SeedSequence(_root_seed if seed is None else seed, spawn_key=keys)
+
+
+def stream(*keys, seed=None):
+    """Independent Generator for the piece of work named by `keys`."""
+    return np.random.default_rng(seed_sequence(*keys, seed=seed))
+
+
+def as_generator(rng=None):
+    """
+    Generator from an int seed, a SeedSequence or a Generator.  None seeds a
+    new Generator from the global `random` state, so engines built without
+    an explicit rng are still reproducible after set_seed() / random.seed().
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if rng is None:
+        rng = random.getrandbits(64)
+    return np.random.default_rng(rng)
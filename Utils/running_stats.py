@@ -0,0 +1,39 @@
+# ──────────────────────────────────────────────────────────
+# Author: Joshua Chua Han Wei – 32781555
+# File: running_stats.py
+# Purpose: Streaming mean / variance (Welford, batched via Chan et al.)
+#          so Monte-Carlo engines never keep per-trial scores.
+# ──────────────────────────────────────────────────────────
+
+import math
+
+class RunningStats:
+    """Running count, mean and sum of squared deviations (M2)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Merge a batch (NumPy array) into the running totals."""
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.count * n_b / n
+        self.count = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    @property
+    def se(self):
+        """Standard error of the mean."""
+        return math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
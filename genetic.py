@@ -24,8 +24,9 @@ Adds depth for FIT3139 Final Report – Modelling Question 2:
 
 # ─────────────────── imports ──────────────────────────────────────────────
 from Utils.save_figure import save_fig
-from Utils.random_seed import set_seed
-import random, itertools, time, math
+from Utils.random_seed import set_seed, seed_sequence
+from Utils.match_cache import MatchCache
+import random, itertools, time, math, os, functools
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -37,7 +38,6 @@ except ModuleNotFoundError:
     smp = None                          # fallback Wilson impl provided
                                         # logistic regression skipped if absent
 
-from Utils.gamestates import state_to_last_moves
 from Strategies.m1strategies import (
     TitForTat, WinStayLoseShift, ReverseTitForTat, GrimTrigger
 )
@@ -46,11 +46,14 @@ from Strategies.m2strategies import (
     Prober, Grim2, GenerousTwoTitForTwo
 )
 from Strategies.chromosomes import ChromosomeStrategy
-from tournament import run_tournament
+from tournament import GenotypePopulation
+from Game.evolution import evolve_replicates
+from Game.parallel import map_replicates
 
 # ─────────────────── hyper-parameters ─────────────────────────────────────
 set_seed()
 GENERATIONS   = 20
+FITNESS_ENGINE = "markov_batched"  # exact, noise-free fitness; "montecarlo" samples TRIALS
 TRIALS        = 1_000
 ROUNDS        = 50
 ERROR         = 0.0
@@ -59,6 +62,12 @@ SEED_STATE    = (2, 6)       # two “co-operative nations”, six “aggressive
 RAND_SEED     = 42
 N_REPS        = 15
 PRINT_EVERY   = 5            # generations between status messages
+WORKERS       = os.cpu_count() or 1  # processes for independent replicates; 1 = serial
+LOCKSTEP      = False        # evolve a variant's replicates together (Game/evolution.py)
+COORDINATOR   = None         # "local", or "host:port" for remote tournament workers
+                             # (per-match engines only; "markov_batched" runs in-process)
+CACHE_MATCHES = True         # on-disk results for the "markov" engine (sampled GA
+                             # matches are seeded per generation and never repeat)
 MU            = 1.0 / (4 ** TitForTat().memory_size)
 
 # robustness flags (toggle as needed)
@@ -76,17 +85,16 @@ def wilson(successes: int, n: int, conf: float = 0.95) -> tuple[float, float]:
     delta = z * math.sqrt(phat*(1 - phat)/n + z*z / (4*n*n))
     return (centre - delta) / denom, (centre + delta) / denom
 
+@functools.cache
+def match_cache() -> MatchCache:
+    """The GA's on-disk match cache, opened on first use."""
+    return MatchCache()
+
 def mutate(parent: ChromosomeStrategy, mu: float = MU) -> ChromosomeStrategy:
     """Bit-flip mutate a parent ChromosomeStrategy → child, preserve niceness."""
-    bits = parent.to_bitstring()
-    for i in range(len(bits)):
-        if random.random() < mu:
-            bits[i] ^= 1
-    child = ChromosomeStrategy(bits)
+    child = parent.mutated(mu)                     # packed genome, no replay
     child.name = f"Chrom_{random.randrange(10**9)}"
-    init = ("CC",) * child.memory_size
-    norm = tuple(state_to_last_moves[s] for s in init)
-    child.is_nice = child.next_move(norm, state_to_last_moves) == "C"
+    child.is_nice = child.next_move(0) == "C"      # index 0 = all-CC history
     return child
 
 def seed_population() -> list[ChromosomeStrategy]:
@@ -102,34 +110,47 @@ def seed_population() -> list[ChromosomeStrategy]:
         pop.append(ch)
     return pop
 
+def initial_population(pop_size: int = POP_SIZE) -> list[ChromosomeStrategy]:
+    """seed_population() resized to pop_size (sensitivity runs)."""
+    pop = seed_population()
+    if len(pop) != pop_size:
+        pop = pop[:pop_size]                       # trim or extend deterministically
+        while len(pop) < pop_size:                 # duplicate last entry if needed
+            pop.append(pop[-1])
+    return pop
+
 def one_run(rule: str, k: int, rep_id: int,
-            pop_size: int = POP_SIZE, mu: float = MU) -> dict:
+            pop_size: int = POP_SIZE, mu: float = MU, verbose: bool = True) -> dict:
     """
     Execute one replicate of the evolutionary IPD.
     rule ∈ {'trunc','prop'}   — selection regime
     k    ∈ {1–4,…}            — elite-slot size
     rep_id                    — unique RNG seed offset
+    verbose                   — print progress every PRINT_EVERY generations
     Returns keys: history, mean_fitness, fix (bool), t_major (float/NaN)
     """
     random.seed(RAND_SEED + 1000 * rep_id)
-    pop = seed_population()
-    # resize initial pop if sensitivity changes pop_size
-    if len(pop) != pop_size:
-        pop = pop[:pop_size]                       # trim or extend deterministically
-        while len(pop) < pop_size:                 # duplicate last entry if needed
-            pop.append(pop[-1])
+    pop = initial_population(pop_size)
 
     history, mean_fitness = [], []
+    # Fitness from the distinct genotypes weighted by their copies: clones and
+    # survivors never replay a match; new genotype pairs use generation g's
+    # streams when sampled
+    options = {}
+    if FITNESS_ENGINE != "markov_batched":
+        options["coordinator"] = COORDINATOR
+    if CACHE_MATCHES and FITNESS_ENGINE == "markov":
+        options["cache"] = match_cache()
+    ledger = GenotypePopulation(engine_type=FITNESS_ENGINE, rounds=ROUNDS, trials=TRIALS,
+                                error=ERROR, **options)
 
     for g in range(1, GENERATIONS + 1):
-        df = run_tournament(pop, "montecarlo",
-                            rounds=ROUNDS, trials=TRIALS, error=ERROR)
-        fits = df.sum(axis=1).reindex([c.name for c in pop]).to_numpy()
+        fits = ledger.fitness(pop, seed=seed_sequence("genetic", rep_id, g, seed=RAND_SEED))
         n_nice = sum(c.is_nice for c in pop)
         history.append(n_nice)
         mean_fitness.append(fits.mean())
 
-        if g % PRINT_EVERY == 0 or g == 1:
+        if verbose and (g % PRINT_EVERY == 0 or g == 1):
             bar = f"[{'#'*n_nice}{'.'*(pop_size - n_nice)}]"
             print(f"     Gen {g:02d}: best={fits.max():6.0f} "
                   f"mean={fits.mean():6.0f} nice={n_nice} {bar}")
@@ -153,6 +174,53 @@ def one_run(rule: str, k: int, rep_id: int,
     return dict(rule=rule, k=k, history=history, mean_fitness=mean_fitness,
                 fix=fixation, t_major=t_major)
 
+def run_replicates(jobs, workers: int = WORKERS, **kwargs) -> list[dict]:
+    """
+    one_run(rule, k, rep_id, **kwargs) for every job, results in job order.
+    Each replicate seeds itself from rep_id, so the results do not depend on
+    `workers`.  Workers are forked – they inherit this script's state without
+    re-running it – so platforms without fork run the jobs serially.  With a
+    COORDINATOR the jobs also run serially: its threads and port belong to
+    this process and cannot be shared with forked children.
+    """
+    if LOCKSTEP:
+        return run_lockstep(jobs, **kwargs)
+    if COORDINATOR is not None and FITNESS_ENGINE != "markov_batched":
+        workers = 1
+    if workers <= 1:
+        return [one_run(*job, **kwargs) for job in jobs]
+    return map_replicates(functools.partial(one_run, verbose=False, **kwargs), jobs, workers)
+
+def run_lockstep(jobs, pop_size: int = POP_SIZE, mu: float = MU) -> list[dict]:
+    """
+    Same jobs on the replicate-vectorised engine: every (rule, k) variant's
+    replicates evolve together as one chromosome tensor, with exact fitness
+    and per-replicate streams keyed by rep_id.  Per-replicate dicts in job
+    order, as one_run returns them.
+    """
+    pop = initial_population(pop_size)
+    # Lift to the largest memory: a memory-m' table only reads the last m'
+    # outcomes (the low base-4 digits), so its bits simply repeat
+    length = max(4 ** c.memory_size for c in pop)
+    bits = np.array([np.tile(c.to_bitstring(), length // 4 ** c.memory_size) for c in pop],
+                    dtype=np.uint8)
+    nice = np.array([bool(c.is_nice) for c in pop])
+    memory = np.array([c.memory_size for c in pop])
+    variants = {}
+    for rule, k, rep_id in jobs:
+        variants.setdefault((rule, k), []).append(rep_id)
+
+    out = {}
+    for (rule, k), rep_ids in variants.items():
+        res = evolve_replicates(bits, nice, rule, k, rep_ids, memory, generations=GENERATIONS,
+                                rounds=ROUNDS, error=ERROR, mu=mu, seed=RAND_SEED)
+        for r, rep_id in enumerate(rep_ids):
+            out[rule, k, rep_id] = dict(
+                rule=rule, k=k, history=res["history"][r].tolist(),
+                mean_fitness=res["mean_fitness"][r].tolist(),
+                fix=bool(res["fix"][r]), t_major=float(res["t_major"][r]))
+    return [out[job] for job in jobs]
+
 # ───────────────── verification sanity test (patched) ─────────────────────
 def verification_test():
     """
@@ -169,16 +237,13 @@ def verification_test():
     print(f"PASS — nice count remained {initial_nice} for all 20 generations\n")
 verification_test()
 # ───────────────────── main experiment (POP_SIZE = 8) ─────────────────────
-results = []
-for rule, k in itertools.product(["trunc", "prop"], [1, 2, 3, 4]):
-    print(f"\n### Running variant: {rule.upper()}  k={k}  "
-          f"({N_REPS} replicates) ###")
-    t0 = time.time()
-    for r in range(1, N_REPS + 1):
-        res = one_run(rule, k,
-                      rep_id=10_000 * k + (0 if rule == "trunc" else 500) + r)
-        results.append(res)
-    print(f"### Variant finished in {time.time() - t0:5.1f} s ###")
+jobs = [(rule, k, 10_000 * k + (0 if rule == "trunc" else 500) + r)
+        for rule, k in itertools.product(["trunc", "prop"], [1, 2, 3, 4])
+        for r in range(1, N_REPS + 1)]
+print(f"\n### Running 8 variants × {N_REPS} replicates on {WORKERS} process(es) ###")
+t0 = time.time()
+results = run_replicates(jobs)
+print(f"### Experiment finished in {time.time() - t0:5.1f} s ###")
 
 df = pd.DataFrame(results)
 
@@ -307,12 +372,10 @@ save_fig("G5_hazard_takeover.png", dpi=300, show=True)
 def sweep(pop_size=None, mu=None, tag=""):
     if pop_size is None: pop_size = POP_SIZE
     if mu is None: mu = MU
-    res = []
-    for rule, k in itertools.product(["trunc", "prop"], [2, 3]):
-        for r in range(N_REPS):
-            res.append(one_run(rule, k, rep_id=30_000 + r,
-                               pop_size=pop_size, mu=mu))
-    res = pd.DataFrame(res)
+    jobs = [(rule, k, 30_000 + r)
+            for rule, k in itertools.product(["trunc", "prop"], [2, 3])
+            for r in range(N_REPS)]
+    res = pd.DataFrame(run_replicates(jobs, pop_size=pop_size, mu=mu))
     print(f"\n=== Robustness {tag} ===")
     print(res.groupby(["rule", "k"]).fix.mean().unstack(0).round(2))
 
@@ -5,6 +5,8 @@
 # ──────────────────────────────────────────────────────────
 from Utils.save_figure import save_fig
 from Utils.random_seed import set_seed
+from Utils.match_cache import MatchCache, match_key
+import copy
 import itertools
 import os
 import numpy as np
@@ -12,7 +14,13 @@ import pandas as pd
 import matplotlib.pyplot as plt
 
 # Import your game engines
-from Game.game import MarkovGame, MonteCarloGame
+from Game.game import MARKOV_CACHE
+from Game.batch import batched_markov_payoffs
+from Game.parallel import (
+    ENGINES, compile_competitors, match_seed, match_generator, play_match, parallel_round_robin
+)
+from Game.distributed import distributed_round_robin
+from Strategies.fsm import strategy_fingerprint
 
 # Import all hand‐coded strategies
 from Strategies.m0strategies import AlwaysCooperate, AlwaysDefect, RandomStrategy
@@ -94,47 +102,320 @@ def run_tournament(
     rounds=50,
     trials=10000,
     error=0.0,
+    antithetic=False,
+    control_variate=False,
+    common_random_numbers=False,
+    crn_seed=0,
+    seed=None,
+    workers=None,
+    coordinator=None,
+    cache=None,
+    pairs=None,
 ):
     """
     Run a round‐robin tournament over the given list of strategy instances.
     Skip self‐matches and avoid redundant matches by only iterating i < j.
     Fill in a symmetric payoff matrix: payoff[i,j] = payoff_i_vs_j, payoff[j,i] = payoff_j_vs_i.
+
+    engine_type="markov_batched" evaluates all pairs at once with the batched
+    Markov kernel (same numbers as "markov", without per-match Python loops).
+    It runs in this process and is exact, so the sampling options and `seed`
+    do not apply; `workers`, `coordinator` and `cache` raise ValueError.
+
+    df.attrs["match_paths"] maps (name_i, name_j) to how each match was
+    evaluated; Monte Carlo engines report "deterministic" when a noise-free
+    match of 0/1 strategies was settled by a single trajectory.
+
+    For engine_type="montecarlo_vectorized", `antithetic` and
+    `control_variate` switch on the engine's variance reduction, and
+    common_random_numbers=True drives every match from the same seed
+    (`crn_seed`), so differences between strategies' payoffs are not swamped
+    by independent sampling noise.  df.attrs["variance_reduction"] then maps
+    (name_i, name_j) to the (player i, player j) variance ratio achieved.
+
+    `seed` (int or SeedSequence, see Utils.random_seed) gives match (i, j) of
+    a Monte Carlo tournament its own stream keyed by the pair, so results are
+    reproducible and independent of the order or process matches run in.
+
+    workers=N spreads the matches over N processes (Game/parallel.py):
+    competitors travel as compiled lookup tables and chunks are balanced by
+    expected cost.  Every match then uses its (i, j) stream – under `seed`,
+    or the set_seed() root – so the DataFrame is identical for any N, and
+    identical to the serial run with the same `seed`.
+
+    coordinator="host:port" hands the matches to TCP workers instead
+    (Game/distributed.py; start them with `python -m Game.distributed worker
+    host:port`), plus `workers` local ones; coordinator="local" is the
+    single-host fallback on the same protocol.  Results match the pool.
+
+    cache=MatchCache(...) (or a path to one, see Utils/match_cache.py) looks
+    every match up by the content hash of both players' policy tables and
+    the match parameters first; only the missing pairs are played, then
+    stored.  Unseeded Monte Carlo matches are not reproducible and are never
+    cached.
+
+    pairs=[(i, j), …] (i < j) plays only those matches – each still on its
+    (i, j) stream – and leaves the rest of the matrix NaN; see PayoffLedger.
     """
     names = [s.name for s in competitors]
     N = len(competitors)
+    engine = engine_type.lower()
+
+    if engine == "markov_batched":
+        given = [name for name, value in
+                 (("workers", workers), ("coordinator", coordinator), ("cache", cache))
+                 if value is not None]
+        if given:
+            raise ValueError(f"engine_type='markov_batched' does not support {', '.join(given)}.")
+        payoff_matrix = batched_markov_payoffs(competitors, rounds=rounds, error=error, pairs=pairs)
+        return pd.DataFrame(payoff_matrix, index=names, columns=names)
 
     # Initialize two N×N numpy arrays of floats; fill diagonals with np.nan (no self‐play)
     payoff_matrix = np.full((N, N), np.nan, dtype=float)
-
-    # Loop over all unordered pairs (i < j)
-    for i, j in itertools.combinations(range(N), 2):
-        strat_i = competitors[i]
-        strat_j = competitors[j]
-
-        # Ensure clean state
-        strat_i.reset()
-        strat_j.reset()
-
-        if engine_type.lower() == "markov":
-            game = MarkovGame(strat_i, strat_j, rounds=rounds, error=error)
-            score_i, score_j, _ = game.run()
-        elif engine_type.lower() == "montecarlo":
-            game = MonteCarloGame(
-                strat_i, strat_j, rounds=rounds, trials=trials, error=error
-            )
-            score_i, score_j = game.run()
-        else:
-            raise ValueError(f"Unknown engine_type: {engine_type!r}")
-
+    # Per-match report of the evaluation path (e.g. Monte Carlo "deterministic" vs "sampled")
+    match_paths = {}
+    variance_reduction = {}
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine_type: {engine_type!r}")
+    settings = dict(rounds=rounds, trials=trials, error=error,
+                    antithetic=antithetic, control_variate=control_variate)
+    seeding = dict(seed=seed, common_random_numbers=common_random_numbers, crn_seed=crn_seed)
+    if pairs is None:
+        pairs = list(itertools.combinations(range(N), 2))
+    else:
+        pairs = [tuple(pair) for pair in pairs]
+
+    # Cached matches are taken as they are; only the rest is played below, and
+    # pairs with identical keys (same tables, same parameters) only once
+    cached, keys, twins = {}, {}, {}
+    if cache is not None:
+        if not isinstance(cache, MatchCache):
+            cache = MatchCache(cache)
+        keys = _match_keys(competitors, pairs, engine, settings, seeding,
+                           per_match=workers is not None or coordinator is not None)
+        stored = cache.get_many(keys.values())
+        for pair, key in keys.items():
+            if key in stored:
+                (score_i, score_j), path, reduction = stored[key]
+                cached[pair] = (score_i, score_j, path, reduction)
+        first = {}
+        for pair in pairs:
+            if pair in keys and pair not in cached:
+                twin = first.setdefault(keys[pair], pair)
+                if twin != pair:
+                    twins[pair] = twin
+        pairs = [pair for pair in pairs if pair not in cached and pair not in twins]
+
+    if coordinator is not None:
+        results = distributed_round_robin(
+            competitors, coordinator, workers or 0, engine, pairs=pairs, **seeding, **settings
+        )
+    elif workers is not None:
+        results = parallel_round_robin(
+            competitors, workers, engine, pairs=pairs, **seeding, **settings
+        )
+    else:
+        # Loop over all unordered pairs (i < j)
+        results = {}
+        for i, j in pairs:
+            strat_i = competitors[i]
+            strat_j = competitors[j]
+
+            # Ensure clean state
+            strat_i.reset()
+            strat_j.reset()
+
+            rng = match_generator(i, j, **seeding)
+            results[(i, j)] = play_match(strat_i, strat_j, engine, rng=rng, **settings)
+
+    if cache is not None:
+        cache.put_many({keys[pair]: ((score_i, score_j), path, reduction)
+                        for pair, (score_i, score_j, path, reduction) in results.items()
+                        if pair in keys})
+        results.update(cached)
+        results.update({pair: results[twin] for pair, twin in twins.items()})
+
+    for (i, j), (score_i, score_j, path, reduction) in sorted(results.items()):
         # Place scores into the payoff_matrix; i vs j → score_i and j vs i → score_j
         payoff_matrix[i, j] = score_i
         payoff_matrix[j, i] = score_j
+        match_paths[(names[i], names[j])] = path
+        if engine == "montecarlo_vectorized":
+            variance_reduction[(names[i], names[j])] = reduction
 
     # Build a pandas DataFrame for convenience
     df = pd.DataFrame(payoff_matrix, index=names, columns=names)
+    df.attrs["match_paths"] = match_paths
+    if variance_reduction:
+        df.attrs["variance_reduction"] = variance_reduction
     return df
 
 
+class PayoffLedger:
+    """
+    Running payoff table keyed by individual identity (the object itself,
+    not its name): scores[(a, b)] = (a's payoff in seat 1 vs b, b's payoff
+    in seat 2 vs a).  Each fitness() call seats every pair as run_tournament
+    does – the one listed first in seat 1 – and plays only the seatings of
+    `population` not met before – e.g. those involving a GA generation's new
+    children, or survivors whose ranks swapped – and keeps the rest, so a
+    generation costs O(POP × children) matches instead of O(POP²).  Both
+    seatings of a pair are kept, since ChromosomeStrategy ignores the seat
+    view and its payoffs depend on the seat.
+
+    An object listed several times counts as that many individuals, keyed
+    (id, copy number), and its extra copies play as deep copies – so every
+    pair keeps its own match (and its own sample under Monte Carlo).
+    """
+
+    def __init__(self, **tournament_kwargs):
+        self.tournament_kwargs = tournament_kwargs
+        self.scores = {}
+        # Current members stay referenced until the next call, so no new
+        # individual can reuse the id of one that still has entries
+        self.members = []
+        self.played = 0
+
+    @staticmethod
+    def keys(population):
+        """(id, copy number) of every individual in `population`."""
+        copies, keys = {}, []
+        for c in population:
+            n = copies.get(id(c), 0)
+            copies[id(c)] = n + 1
+            keys.append((id(c), n))
+        return keys
+
+    def fitness(self, population, **overrides):
+        """Total payoff of every individual against the rest of `population`."""
+        keys = self.keys(population)
+        alive = set(keys)
+        self.scores = {key: value for key, value in self.scores.items()
+                       if key[0] in alive and key[1] in alive}
+        self.members = list(population)
+
+        all_pairs = list(itertools.combinations(range(len(population)), 2))
+        new = [(i, j) for i, j in all_pairs if (keys[i], keys[j]) not in self.scores]
+        if new:
+            players = [c if key[1] == 0 else copy.deepcopy(c)
+                       for c, key in zip(population, keys)]
+            df = run_tournament(players, pairs=new, **{**self.tournament_kwargs, **overrides})
+            matrix = df.to_numpy()
+            for i, j in new:
+                self.scores[(keys[i], keys[j])] = (matrix[i, j], matrix[j, i])
+            self.played += len(new)
+
+        fits = np.zeros(len(population))
+        for i, j in all_pairs:
+            score_i, score_j = self.scores[(keys[i], keys[j])]
+            fits[i] += score_i
+            fits[j] += score_j
+        return fits
+
+
+class GenotypePopulation:
+    """
+    Population kept as its distinct genotypes (strategy_fingerprint) with
+    multiplicities.  Each ordered pair of genotypes is played once – the
+    first in seat 1 – and remembered while both are present, so clones cost
+    nothing and a generation costs O(distinct²) matches at most, not O(POP²).
+
+    Seats matter for strategies that ignore the seat view (ChromosomeStrategy),
+    so individuals are seated as run_tournament seats them, by their order
+    in this call's `population`: an individual's fitness is the count-weighted
+    sum of its genotype's seat-1 payoffs against the genotypes listed after
+    it and seat-2 payoffs against those listed before it – the full
+    round-robin's numbers, exactly (up to float rounding) for the Markov
+    engines.  Monte Carlo engines draw one sample per ordered genotype pair,
+    shared by all clones.  That sample's stream is run_tournament's (i, j)
+    stream for the pair's positions in this call's list of distinct genotypes
+    (ordered by first appearance), not a key derived from the genotypes
+    themselves – so under a fixed `seed`, the same genotype pair can draw a
+    different stream in another population.
+    """
+
+    def __init__(self, **tournament_kwargs):
+        self.tournament_kwargs = tournament_kwargs
+        self.scores = {}                  # (genotype a, genotype b) → (a in seat 1, b in seat 2)
+        self.genotypes = {}               # genotype → representative individual
+        self.counts = {}                  # genotype → copies in the population
+        self.played = 0
+
+    def update(self, population):
+        """Adopt `population`; returns the genotype key of every individual."""
+        keys = []
+        for c in population:
+            key = strategy_fingerprint(c)
+            if key is None:
+                raise ValueError(f"{c.name} has no genotype fingerprint.")
+            keys.append(key)
+        self.genotypes, self.counts = {}, {}
+        for key, c in zip(keys, population):
+            self.genotypes.setdefault(key, c)
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.scores = {pair: value for pair, value in self.scores.items()
+                       if pair[0] in self.counts and pair[1] in self.counts}
+        return keys
+
+    def fitness(self, population, **overrides):
+        """Total payoff of every individual against the rest of `population`."""
+        keys = self.update(population)
+        distinct = list(self.genotypes)
+        index = {key: d for d, key in enumerate(distinct)}
+        n, n_types = len(population), len(distinct)
+
+        # Genotype counts listed before / after each individual
+        onehot = np.zeros((n, n_types))
+        onehot[np.arange(n), [index[key] for key in keys]] = 1.0
+        before = np.cumsum(onehot, axis=0) - onehot
+        after = onehot.sum(axis=0) - before - onehot
+
+        needed = {(distinct[b], keys[p]) for p in range(n) for b in np.flatnonzero(before[p])}
+        new = [pair for pair in needed if pair not in self.scores]
+        if new:
+            reps = [self.genotypes[key] for key in distinct]
+            # Separate objects for seat 2, so a genotype can meet itself
+            seat_2_reps = [copy.deepcopy(r) for r in reps]
+            new_pairs = [(index[a], n_types + index[b]) for a, b in new]
+            kwargs = {**self.tournament_kwargs, **overrides}
+            df = run_tournament(reps + seat_2_reps, pairs=new_pairs, **kwargs)
+            matrix = df.to_numpy()
+            for a, b in new:
+                i, j = index[a], n_types + index[b]
+                self.scores[(a, b)] = (matrix[i, j], matrix[j, i])
+            self.played += len(new)
+
+        seat_1 = np.zeros((n_types, n_types))     # [a, b]: a's payoff, a in seat 1 vs b
+        seat_2 = np.zeros((n_types, n_types))     # [a, b]: b's payoff, b in seat 2 vs a
+        for (a, b), (score_a, score_b) in self.scores.items():
+            seat_1[index[a], index[b]] = score_a
+            seat_2[index[a], index[b]] = score_b
+
+        fits = np.zeros(n)
+        for p, key in enumerate(keys):
+            g = index[key]
+            fits[p] = after[p] @ seat_1[g] + before[p] @ seat_2[:, g]
+        return fits
+
+
+def _match_keys(competitors, pairs, engine, settings, seeding, per_match):
+    """Cache key of every reproducible pair (unseeded Monte Carlo is skipped)."""
+    tables_1, tables_2 = compile_competitors(competitors)
+    params = dict(engine=engine, rounds=settings["rounds"], error=settings["error"],
+                  initial_state="CC")
+    if engine != "markov":
+        params.update(trials=settings["trials"], antithetic=settings["antithetic"],
+                      control_variate=settings["control_variate"])
+    keys = {}
+    for i, j in pairs:
+        sequence = None if engine == "markov" else match_seed(i, j, per_match=per_match, **seeding)
+        if engine != "markov" and sequence is None:
+            continue
+        keys[(i, j)] = match_key(tables_1[i], tables_2[j], seed=sequence, **params)
+    return keys
+
+
 # ----------------------------------------------------------------------
 # 4)  USAGE 
 # ----------------------------------------------------------------------
@@ -143,20 +424,22 @@ if __name__ == "__main__":
     TRIALS = 10_000
     ERR_0 = 0.0
     ERR_1 = 0.05
+    CACHE = MatchCache()        # reruns only play pairs not seen before
 
     # A) Markov, no error
     df_markov_noerr = run_tournament(
-        competitors, engine_type="markov", rounds=ROUNDS, error=ERR_0
+        competitors, engine_type="markov", rounds=ROUNDS, error=ERR_0, cache=CACHE
     )
     print("\n--- Markov Tournament (error=0.00) ---")
     print(df_markov_noerr.round(2))
 
     # B) Markov, with error
     df_markov_err = run_tournament(
-        competitors, engine_type="markov", rounds=ROUNDS, error=ERR_1
+        competitors, engine_type="markov", rounds=ROUNDS, error=ERR_1, cache=CACHE
     )
     print("\n--- Markov Tournament (error=0.05) ---")
     print(df_markov_err.round(2))
+    print(f"Markov cache: {MARKOV_CACHE.stats()}")
 
     # C) Monte Carlo, no error
     df_mc_noerr = run_tournament(
@@ -7,11 +7,14 @@
 # ------------------------------------------------------------------- imports
 from Utils.save_figure import save_fig
 from Utils.random_seed import set_seed
+from Utils.match_cache import MatchCache, match_key
 import itertools, time
 import numpy  as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from Game.game import MonteCarloGame
+from Game.montecarlo import CoupledNoiseSweep
+from Game.batch import batched_markov_payoffs
+from Game.parallel import compile_competitors
 
 
 # --------------------------- strategy imports (unchanged) -------------------
@@ -26,7 +29,8 @@ from Strategies.m3strategies import (
 # ---------------------------------------------------------------- constants
 set_seed()
 ROUNDS       = 50
-TRIALS       = 10_000
+TRIALS       = 10_000         # plain sampling per match in the coupled sweep
+CRN_SEED     = 0              # common random numbers shared by every match
 ERROR_LEVELS = [0.00, 0.05, 0.10]
 MAKE_BARCHART = False          # set True if want per-ε bar charts
 
@@ -50,16 +54,44 @@ def timestamp(msg: str) -> None:
     print(f"[{time.strftime('%H:%M:%S')}] {msg}")
 
 def run_tournament(err: float) -> pd.Series:
-    """Round-robin Monte-Carlo; returns per-strategy avg pay-off / round."""
-    pay = np.zeros(N)
+    """
+    Exact round-robin at one ε; returns per-strategy avg pay-off / round.
+    Every competitor here is memory-m lookup (or RandomStrategy), so the
+    batched Markov kernel gives the expectation sampling would estimate.
+    """
+    payoff = batched_markov_payoffs(competitors, rounds=ROUNDS, error=err)
+    return pd.Series(np.nansum(payoff, axis=1) / ROUNDS, index=strategy_names)
+
+def run_sweep(errors) -> pd.DataFrame:
+    """
+    Coupled round-robin over every ε at once: each match is one
+    CoupledNoiseSweep pass, so the per-ε columns share their random draws and
+    slopes between them are far less noisy than independent tournaments.
+    Finished matches are kept in the on-disk match cache, so reruns only
+    simulate pairs (or parameters) not seen before.
+    """
+    cache = MatchCache()
+    tables_1, tables_2 = compile_competitors(competitors)
+    E = len(errors)
+    pay = np.zeros((N, E))
     for i, j in itertools.combinations(range(N), 2):
-        s_i, s_j = competitors[i], competitors[j]
-        s_i.reset(); s_j.reset()
-        game = MonteCarloGame(s_i, s_j, ROUNDS, err, trials=TRIALS)
-        sc_i, sc_j = game.run()
+        key = match_key(tables_1[i], tables_2[j], engine="coupled_sweep",
+                        errors=[float(ε) for ε in errors], rounds=ROUNDS,
+                        trials=TRIALS, seed=CRN_SEED, initial_state="CC")
+        hit = cache.get(key)
+        if hit is not None:
+            sc_i, sc_j = np.array(hit[0][:E]), np.array(hit[0][E:])
+        else:
+            s_i, s_j = competitors[i], competitors[j]
+            s_i.reset(); s_j.reset()
+            sweep = CoupledNoiseSweep(s_i, s_j, errors, ROUNDS, trials=TRIALS,
+                                      rng=np.random.default_rng(CRN_SEED))
+            sc_i, sc_j = sweep.run()
+            cache.put(key, ((*sc_i, *sc_j), "sampled", None))
         pay[i] += sc_i / ROUNDS
         pay[j] += sc_j / ROUNDS
-    return pd.Series(pay, index=strategy_names)
+    labels = [f"{int(ε*100)}%" for ε in errors]
+    return pd.DataFrame(pay, index=strategy_names, columns=labels)
 
 def class_gap(series: pd.Series) -> tuple[float,float,float]:
     nice  = series[[k for k in series.index if name_to_nice[k]]].mean()
@@ -68,20 +100,20 @@ def class_gap(series: pd.Series) -> tuple[float,float,float]:
 
 # ------------------------------------------------------------- main sweep
 if __name__ == "__main__":
-    timestamp("Starting Monte-Carlo sweep")
-    payoff_sweep = pd.DataFrame(index=strategy_names)
+    timestamp("Starting Monte-Carlo sweep (coupled across ε)")
+    payoff_sweep = run_sweep(ERROR_LEVELS)
     gap_records  = []
 
     for ε in ERROR_LEVELS:
         label = f"{int(ε*100)}%"
-        timestamp(f"Simulating ε = {ε:.0%}")
-        series = run_tournament(ε)
-        payoff_sweep[label] = series
+        series = payoff_sweep[label]
 
         nice_m, nasty_m, gap = class_gap(series)
         gap_records.append({"ε": ε, "nice": nice_m,
                             "nasty": nasty_m, "gap": gap})
         timestamp(f"  → nice = {nice_m:.2f}, nasty = {nasty_m:.2f}, gap = {gap:+.2f}")
+        exact = run_tournament(ε)
+        timestamp(f"  → max |sampled − exact| = {(series - exact).abs().max():.4f}")
 
     gap_df = pd.DataFrame(gap_records).set_index("ε")
     print("\n=== Class gap summary ===")